@@ -1,91 +1,182 @@
 #!/usr/bin/env python3
 
 
-from src.membership.config import MESSAGES, DEFAULT_OUTPUT_PATH
-from src.membership import DataLoader, MembershipAnalytics, ReportGenerator
+from src.membership.config import (
+    MESSAGES, DEFAULT_DATA_PATH, DEFAULT_OUTPUT_PATH, DEFAULT_EXCEL_PATH,
+    DEFAULT_PARQUET_DIR, LOG_BUFFER_CAPACITY
+)
+from src.membership import DataLoader, MembershipAnalytics, ReportGenerator, StatsCache
+import argparse
+from importlib.util import find_spec
+import logging
+from logging.handlers import MemoryHandler
 import sys
 import os
 from pathlib import Path
 
-# Agregar el directorio src al path para imports
-sys.path.insert(0, str(Path(__file__).parent / "src"))
+logger = logging.getLogger('membership')
+
+REQUIRED_MODULES = ('pandas', 'matplotlib')
+
+
+def configure_logging(capacity=LOG_BUFFER_CAPACITY):
+    """Envía los mensajes de estado a stdout a través de un buffer en memoria"""
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter('%(message)s'))
+
+    # Los mensajes se acumulan y se escriben juntos; los errores se vuelcan al instante
+    buffer_handler = MemoryHandler(
+        capacity, flushLevel=logging.ERROR, target=stream_handler)
+    logging.getLogger().addHandler(buffer_handler)
+
+    for name in (logger.name, DataLoader.__module__.rpartition('.')[0]):
+        logging.getLogger(name).setLevel(logging.INFO)
+
+
+def flush_logs():
+    """Escribe los mensajes de estado pendientes"""
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+
+
+_SUMMARY_TEMPLATE = """
+📊 RESUMEN DEL ANÁLISIS:
+----------------------------------------
+💰 Ingresos Totales: S/ {revenue:,.2f}
+📝 Total Membresías: {memberships}
+👥 Clientes Únicos: {customers}
+🎯 Ticket Promedio: S/ {ticket:,.2f}
+📈 Mejor Mes: {best_month}
+🏆 Mejor Plan: {best_plan}
+🔮 Proyección Agosto: S/ {projection:,.0f}
+📄 Archivo Generado: {output_file}"""
 
 
 class MembershipReportRunner:
     """Coordinador principal para ejecutar el análisis completo de membresías"""
 
-    def __init__(self, data_path="data/membership/", output_file=DEFAULT_OUTPUT_PATH):
+    def __init__(self, data_path=DEFAULT_DATA_PATH, output_file=DEFAULT_OUTPUT_PATH,
+                 use_cache=True):
         self.data_path = data_path
         self.output_file = output_file
+        self.stats_cache = StatsCache(data_path) if use_cache else None
         self.data_loader = None
+        self._data_cache = None
+        self._cache_key = None
+        self._cached_stats = None
         self.analytics = None
         self.report_generator = None
 
+    @property
+    def _data(self):
+        """Datos preparados por el DataLoader, obtenidos una sola vez"""
+        if self._data_cache is None:
+            self._data_cache = self.data_loader.get_data()
+        return self._data_cache
+
     def run_complete_analysis(self):
         """Ejecuta el análisis completo de membresías"""
         try:
-            print(MESSAGES['analysis_start'])
-            print("="*60)
+            logger.info(MESSAGES['analysis_start'])
+            logger.info("="*60)
 
             # Paso 1: Cargar y preparar datos
-            print("📊 Paso 1: Cargando datos...")
+            logger.info("📊 Paso 1: Cargando datos...")
             self._load_and_prepare_data()
 
             # Paso 2: Realizar análisis estadísticos
-            print("📈 Paso 2: Calculando estadísticas...")
+            logger.info("📈 Paso 2: Calculando estadísticas...")
             self._perform_analytics()
 
             # Paso 3: Generar reporte PDF
-            print("📄 Paso 3: Generando reporte PDF...")
+            logger.info("📄 Paso 3: Generando reporte PDF...")
             self._generate_report()
 
             # Paso 4: Mostrar resumen
-            print("📋 Paso 4: Mostrando resumen...")
+            logger.info("📋 Paso 4: Mostrando resumen...")
             self._show_summary()
 
-            print("="*60)
-            print("✅ " + MESSAGES['analysis_complete'])
+            logger.info("="*60)
+            logger.info("✅ " + MESSAGES['analysis_complete'])
 
         except Exception as e:
-            print(f"❌ Error durante el análisis: {e}")
+            logger.error(f"❌ Error durante el análisis: {e}")
             raise
 
+        finally:
+            flush_logs()
+
     def _load_and_prepare_data(self):
         """Carga y prepara los datos"""
         self.data_loader = DataLoader(self.data_path)
+        self._data_cache = None
+        self._cached_stats = None
 
-        # Cargar datos de archivos CSV
-        self.data_loader.load_data()
+        # Si los CSV no cambiaron, se omiten la lectura y la preparación
+        if not self._restore_from_cache():
+            # Cargar datos de archivos CSV
+            self.data_loader.load_data()
 
-        # Preparar y combinar datos
-        self.data_loader.prepare_data()
+            # Preparar y combinar datos
+            self.data_loader.prepare_data()
 
         # Validar datos cargados
         issues = self.data_loader.validate_data()
         if issues:
-            print("⚠️  Problemas encontrados en los datos:")
+            logger.info("⚠️  Problemas encontrados en los datos:")
             for issue in issues:
-                print(f"   - {issue}")
+                logger.info(f"   - {issue}")
         else:
-            print("✅ Datos cargados y validados correctamente")
+            logger.info("✅ Datos cargados y validados correctamente")
+
+    def _restore_from_cache(self):
+        """Recupera los datos preparados y las estadísticas de la caché en disco"""
+        if self.stats_cache is None:
+            return False
+
+        self._cache_key = self.stats_cache.get_key()
+        cached = self.stats_cache.load(self._cache_key)
+        if cached is None:
+            return False
+
+        self.data_loader.restore(cached['combined_df'], cached['monthly_summary'])
+        self._cached_stats = cached['stats']
+        logger.info("♻️  " + MESSAGES['cache_hit'].format(cache_key=self._cache_key))
+        return True
 
     def _perform_analytics(self):
         """Realiza todos los cálculos analíticos"""
-        data = self.data_loader.get_data()
+        data = self._data
 
         self.analytics = MembershipAnalytics(
             data['combined_df'],
             data['monthly_summary']
         )
 
-        # Calcular todas las estadísticas
-        stats = self.analytics.calculate_all_stats()
+        # Calcular todas las estadísticas, reutilizando la caché si los CSV no cambiaron
+        stats = self._calculate_stats()
 
-        print(f"✅ Estadísticas calculadas: {len(stats)} categorías")
+        logger.info(f"✅ Estadísticas calculadas: {len(stats)} categorías")
+
+    def _calculate_stats(self):
+        """Calcula las estadísticas o las recupera de la caché en disco"""
+        if self._cached_stats is not None:
+            self.analytics.stats = self._cached_stats
+            return self._cached_stats
+
+        stats = self.analytics.calculate_all_stats()
+        if self.stats_cache is not None:
+            data = self._data
+            self.stats_cache.save(self._cache_key, {
+                'combined_df': data['combined_df'],
+                'monthly_summary': data['monthly_summary'],
+                'stats': stats
+            })
+        return stats
 
     def _generate_report(self):
         """Genera el reporte PDF completo"""
-        data = self.data_loader.get_data()
+        data = self._data
         stats = self.analytics.stats
 
         self.report_generator = ReportGenerator(
@@ -97,15 +188,15 @@ class MembershipReportRunner:
         # Validar antes de generar
         issues = self.report_generator.validate_report_generation()
         if issues:
-            print("⚠️  Problemas encontrados para generar el reporte:")
+            logger.info("⚠️  Problemas encontrados para generar el reporte:")
             for issue in issues:
-                print(f"   - {issue}")
+                logger.info(f"   - {issue}")
             return
 
         # Generar PDF
         self.report_generator.generate_pdf_report(self.output_file)
 
-        print("✅ Reporte PDF generado exitosamente")
+        logger.info("✅ Reporte PDF generado exitosamente")
 
     def _show_summary(self):
         """Muestra un resumen del análisis"""
@@ -114,25 +205,31 @@ class MembershipReportRunner:
 
         stats = self.analytics.stats
 
-        print("\n📊 RESUMEN DEL ANÁLISIS:")
-        print("-" * 40)
-        print(f"💰 Ingresos Totales: S/ {stats['total_revenue']:,.2f}")
-        print(f"📝 Total Membresías: {stats['total_memberships']}")
-        print(f"👥 Clientes Únicos: {stats['unique_customers']}")
-        print(f"🎯 Ticket Promedio: S/ {stats['avg_ticket']:,.2f}")
-        print(f"📈 Mejor Mes: {stats['trends']['mejor_mes_ingresos']}")
-        print(f"🏆 Mejor Plan: {stats['by_plan'].index[0]}")
-        print(
-            f"🔮 Proyección Agosto: S/ {stats['projections']['agosto_ingresos_estimados']:,.0f}")
-        print(f"📄 Archivo Generado: {self.output_file}")
-
-    def generate_excel_export(self, excel_file="datos_membresias_detallados.xlsx"):
+        logger.info(_SUMMARY_TEMPLATE.format(
+            revenue=stats['total_revenue'],
+            memberships=stats['total_memberships'],
+            customers=stats['unique_customers'],
+            ticket=stats['avg_ticket'],
+            best_month=stats['trends']['mejor_mes_ingresos'],
+            best_plan=stats['by_plan'].index[0],
+            projection=stats['projections']['agosto_ingresos_estimados'],
+            output_file=self.output_file
+        ))
+
+    def generate_excel_export(self, excel_file=DEFAULT_EXCEL_PATH):
         """Genera exportación adicional a Excel"""
         if self.report_generator:
             self.report_generator.export_data_to_excel(excel_file)
             return True
         return False
 
+    def generate_parquet_export(self, output_dir=DEFAULT_PARQUET_DIR):
+        """Genera exportación adicional a Parquet"""
+        if self.report_generator:
+            self.report_generator.export_data_to_parquet(output_dir)
+            return True
+        return False
+
     def get_quick_stats(self):
         """Retorna estadísticas rápidas para uso programático"""
         if not self.analytics:
@@ -141,91 +238,145 @@ class MembershipReportRunner:
         return self.analytics.stats
 
 
+_BANNER = """
+============================================================
+ANÁLISIS DE MEMBRESÍAS - VERSIÓN REFACTORIZADA
+============================================================
+📁 ESTRUCTURA DEL PROYECTO:
+├── membership.py              # 🎯 Script principal (este archivo)
+├── total.py                   # 📊 Script de análisis total
+├── data/membership/           # 📂 Datos de membresías
+└── src/membership/            # 🔧 Módulos refactorizados:
+    ├── __init__.py           #    📦 Inicialización del paquete
+    ├── config.py             #    ⚙️  Configuraciones
+    ├── data_loader.py        #    📥 Carga de datos
+    ├── analytics.py          #    🧮 Cálculos estadísticos
+    ├── visualizations.py     #    📊 Creación de gráficos
+    └── report_generator.py   #    📄 Generación de PDF
+
+🎯 VENTAJAS DE LA REFACTORIZACIÓN:
+✅ Código más limpio y mantenible
+✅ Responsabilidades separadas
+✅ Fácil testing de componentes
+✅ Extensibilidad mejorada
+✅ Reutilización de código"""
+
+
 def print_project_info():
     """Muestra información sobre la estructura del proyecto"""
-    print("\n" + "="*60)
-    print("ANÁLISIS DE MEMBRESÍAS - VERSIÓN REFACTORIZADA")
-    print("="*60)
-    print("📁 ESTRUCTURA DEL PROYECTO:")
-    print("├── membership.py              # 🎯 Script principal (este archivo)")
-    print("├── total.py                   # 📊 Script de análisis total")
-    print("├── data/membership/           # 📂 Datos de membresías")
-    print("└── src/membership/            # 🔧 Módulos refactorizados:")
-    print("    ├── __init__.py           #    📦 Inicialización del paquete")
-    print("    ├── config.py             #    ⚙️  Configuraciones")
-    print("    ├── data_loader.py        #    📥 Carga de datos")
-    print("    ├── analytics.py          #    🧮 Cálculos estadísticos")
-    print("    ├── visualizations.py     #    📊 Creación de gráficos")
-    print("    └── report_generator.py   #    📄 Generación de PDF")
-    print("\n🎯 VENTAJAS DE LA REFACTORIZACIÓN:")
-    print("✅ Código más limpio y mantenible")
-    print("✅ Responsabilidades separadas")
-    print("✅ Fácil testing de componentes")
-    print("✅ Extensibilidad mejorada")
-    print("✅ Reutilización de código")
-
-
-def main():
+    logger.info(_BANNER)
+
+
+def find_missing_dirs(paths):
+    """Retorna las carpetas de paths que no existen
+
+    Lee cada carpeta padre una sola vez con os.scandir en lugar de hacer
+    un stat() por ruta.
+    """
+    existing = {}
+    for parent in {path.parent for path in paths}:
+        try:
+            with os.scandir(parent) as entries:
+                existing[parent] = {entry.name for entry in entries if entry.is_dir()}
+        except (FileNotFoundError, NotADirectoryError):
+            existing[parent] = set()
+
+    # Path('.') no tiene nombre: es la carpeta actual, que siempre existe
+    return {path for path in paths
+            if path.name and path.name not in existing[path.parent]}
+
+
+def parse_args(argv=None):
+    """Lee las opciones de línea de comandos"""
+    parser = argparse.ArgumentParser(
+        description="Genera el reporte PDF del análisis de membresías")
+    parser.add_argument('--excel', action=argparse.BooleanOptionalAction, default=False,
+                        help="exportar también los datos detallados a Excel")
+    parser.add_argument('--data-path', default=DEFAULT_DATA_PATH,
+                        help=f"carpeta con los CSV mensuales (por defecto: {DEFAULT_DATA_PATH})")
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT_PATH,
+                        help=f"ruta del PDF generado (por defecto: {DEFAULT_OUTPUT_PATH})")
+    parser.add_argument('--excel-output', default=DEFAULT_EXCEL_PATH,
+                        help=f"ruta del Excel generado (por defecto: {DEFAULT_EXCEL_PATH})")
+    parser.add_argument('--parquet', action=argparse.BooleanOptionalAction, default=False,
+                        help="exportar también los datos detallados a Parquet (requiere pyarrow)")
+    parser.add_argument('--parquet-output', default=DEFAULT_PARQUET_DIR,
+                        help=f"carpeta de los Parquet generados (por defecto: {DEFAULT_PARQUET_DIR})")
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help="omitir el encabezado con la estructura del proyecto")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Función principal"""
-    print_project_info()
+    args = parse_args(argv)
+
+    if not args.quiet:
+        print_project_info()
 
     # Verificar dependencias
-    print("\n🔍 Verificando dependencias...")
-    try:
-        import pandas as pd
-        import matplotlib.pyplot as plt
-        import seaborn as sns
-        print("✅ Todas las dependencias están instaladas")
-    except ImportError as e:
-        print(f"❌ Falta instalar: {e}")
-        print("Ejecuta: pip install pandas matplotlib seaborn")
-        return 1
+    logger.info("\n🔍 Verificando dependencias...")
+    # find_spec solo localiza el módulo, sin pagar el costo de importarlo
+    for module_name in REQUIRED_MODULES:
+        if find_spec(module_name) is None:
+            logger.error(f"❌ Falta instalar: {module_name}")
+            logger.info(f"Ejecuta: pip install {' '.join(REQUIRED_MODULES)}")
+            return 1
+    logger.info("✅ Todas las dependencias están instaladas")
 
     # Verificar estructura de carpetas
-    print("🔍 Verificando estructura de carpetas...")
-    data_path = Path("data/membership/")
+    logger.info("🔍 Verificando estructura de carpetas...")
+    data_path = Path(args.data_path)
     src_path = Path("src/membership/")
+    missing_dirs = find_missing_dirs([data_path, src_path])
 
-    if not data_path.exists():
-        print(f"❌ No se encuentra la carpeta: {data_path}")
-        print("Asegúrate de tener los archivos CSV en data/membership/")
+    if data_path in missing_dirs:
+        logger.error(f"❌ No se encuentra la carpeta: {data_path}")
+        logger.info(f"Asegúrate de tener los archivos CSV en {data_path}/")
         return 1
 
-    if not src_path.exists():
-        print(f"❌ No se encuentra la carpeta: {src_path}")
-        print("Asegúrate de tener los módulos en src/membership/")
+    if src_path in missing_dirs:
+        logger.error(f"❌ No se encuentra la carpeta: {src_path}")
+        logger.info("Asegúrate de tener los módulos en src/membership/")
         return 1
 
-    print("✅ Estructura de carpetas correcta")
+    logger.info("✅ Estructura de carpetas correcta")
 
     # Ejecutar análisis
     try:
-        runner = MembershipReportRunner()
+        runner = MembershipReportRunner(args.data_path, args.output)
         runner.run_complete_analysis()
 
         # Opción adicional: generar Excel
-        print("\n📊 ¿Deseas generar también un archivo Excel con los datos? (y/n): ", end="")
-        response = input().lower().strip()
-
-        if response in ['y', 'yes', 'sí', 's']:
-            print("📈 Generando archivo Excel...")
-            if runner.generate_excel_export():
-                print("✅ Archivo Excel generado: datos_membresias_detallados.xlsx")
-
-        print("\n🎉 ANÁLISIS COMPLETADO EXITOSAMENTE")
-        print("\n📋 ARCHIVOS GENERADOS:")
-        print(f"   📄 PDF: {DEFAULT_OUTPUT_PATH}")
-        if response in ['y', 'yes', 'sí', 's']:
-            print("   📊 Excel: datos_membresias_detallados.xlsx")
+        if args.excel:
+            logger.info("📈 Generando archivo Excel...")
+            if runner.generate_excel_export(args.excel_output):
+                logger.info(f"✅ Archivo Excel generado: {args.excel_output}")
+
+        # Opción adicional: generar Parquet
+        if args.parquet:
+            logger.info("📦 Generando archivos Parquet...")
+            if runner.generate_parquet_export(args.parquet_output):
+                logger.info(f"✅ Archivos Parquet generados: {args.parquet_output}")
+
+        logger.info("\n🎉 ANÁLISIS COMPLETADO EXITOSAMENTE")
+        logger.info("\n📋 ARCHIVOS GENERADOS:")
+        logger.info(f"   📄 PDF: {args.output}")
+        if args.excel:
+            logger.info(f"   📊 Excel: {args.excel_output}")
+        if args.parquet:
+            logger.info(f"   📦 Parquet: {args.parquet_output}")
 
         return 0
 
     except Exception as e:
-        print(f"\n❌ Error durante la ejecución: {e}")
-        print("Revisa los datos y la configuración")
+        logger.error(f"\n❌ Error durante la ejecución: {e}")
+        logger.info("Revisa los datos y la configuración")
         return 1
 
 
 if __name__ == "__main__":
+    configure_logging()
     exit_code = main()
+    flush_logs()
     exit(exit_code)
@@ -0,0 +1,9 @@
+"""
+Utilidades compartidas por los paquetes de análisis
+"""
+
+from .cache import DiskCache
+
+__all__ = [
+    'DiskCache'
+]
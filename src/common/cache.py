@@ -0,0 +1,56 @@
+"""
+Base de las cachés en disco de los datos preparados
+"""
+
+import glob
+import hashlib
+import os
+from pathlib import Path
+
+
+class DiskCache:
+    """Clave por el estado de los CSV y de los módulos fuente, y evicción de
+    las entradas usadas menos recientemente. Cada subclase define cómo guarda
+    sus datos y en qué archivos (_get_entry_files)"""
+
+    def __init__(self, data_path, cache_dir, max_entries, source_files):
+        self.data_path = data_path
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.source_files = source_files
+
+    def get_key(self):
+        """Calcula la clave a partir de (ruta, mtime, tamaño) de cada archivo"""
+        file_paths = sorted(glob.glob(os.path.join(self.data_path, '*.csv')))
+        file_paths += [str(path) for path in self.source_files]
+
+        entries = []
+        for file_path in file_paths:
+            stat = os.stat(file_path)
+            entries.append((file_path, stat.st_mtime_ns, stat.st_size))
+
+        return hashlib.blake2b(repr(entries).encode(), digest_size=16).hexdigest()
+
+    def _get_entry_files(self, key):
+        """Retorna los archivos de una entrada; el primero la identifica"""
+        raise NotImplementedError
+
+    def _touch(self, key):
+        """Marca la entrada como usada recientemente para la evicción LRU"""
+        for path in self._get_entry_files(key):
+            os.utime(path)
+
+    def _evict(self):
+        """Conserva solo las entradas usadas más recientemente"""
+        # El nombre del primer archivo con '*' como clave sirve de patrón
+        pattern = self._get_entry_files('*')[0].name
+        prefix, suffix = pattern.split('*')
+        entry_files = sorted(
+            self.cache_dir.glob(pattern),
+            key=lambda path: path.stat().st_mtime_ns,
+            reverse=True
+        )
+        for entry_file in entry_files[self.max_entries:]:
+            key = entry_file.name[len(prefix):len(entry_file.name) - len(suffix)]
+            for path in self._get_entry_files(key):
+                path.unlink(missing_ok=True)
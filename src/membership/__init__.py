@@ -2,6 +2,7 @@ from .data_loader import DataLoader
 from .analytics import MembershipAnalytics
 from .visualizations import MembershipVisualizations
 from .report_generator import ReportGenerator
+from .cache import StatsCache
 
 __version__ = "1.0.0"
 __author__ = "Tu Nombre"
@@ -10,5 +11,6 @@ __all__ = [
     'DataLoader',
     'MembershipAnalytics',
     'MembershipVisualizations',
-    'ReportGenerator'
+    'ReportGenerator',
+    'StatsCache'
 ]
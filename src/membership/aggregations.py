@@ -0,0 +1,80 @@
+"""
+Módulo con agregaciones por grupo basadas en np.bincount y cálculos
+periodo a periodo sobre matrices de NumPy
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def aggregate_by_codes(codes, size, amounts, emails):
+    """Suma, cantidad, promedio y clientes únicos por código de grupo
+
+    codes son enteros en [0, size); cada agregado es un solo recorrido de
+    np.bincount en lugar de un groupby de pandas por métrica.
+    """
+    codes = np.asarray(codes, dtype=np.intp)
+    amounts = np.asarray(amounts, dtype=np.float64)
+    emails = np.asarray(emails, dtype=object)
+
+    # Igual que groupby: las filas sin grupo (código -1) se descartan
+    grouped = codes >= 0
+    if not grouped.all():
+        codes, amounts, emails = codes[grouped], amounts[grouped], emails[grouped]
+
+    # Igual que groupby: los montos nulos no suman ni cuentan
+    valid = ~np.isnan(amounts)
+    sums = np.bincount(codes[valid], weights=amounts[valid], minlength=size)
+    counts = np.bincount(codes[valid], minlength=size)
+    rows = np.bincount(codes, minlength=size)
+
+    # Clientes únicos: pares (grupo, email) distintos, contados por grupo
+    uniques = count_unique_by_codes(codes, size, emails)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+
+    return {
+        'sum': sums,
+        'count': counts,
+        'mean': means,
+        'nunique': uniques,
+        'observed': rows > 0
+    }
+
+
+def count_unique_by_codes(codes, size, values):
+    """Cantidad de valores distintos (sin contar nulos) por código de grupo
+
+    Los valores se factorizan a enteros una sola vez y cada par (grupo, valor)
+    se codifica como un entero, así que deduplicar es un np.unique numérico
+    en lugar de un drop_duplicates sobre strings.
+    """
+    codes = np.asarray(codes, dtype=np.intp)
+    value_codes, distinct = pd.factorize(np.asarray(values, dtype=object))
+    n_distinct = len(distinct)
+    if n_distinct == 0:
+        return np.zeros(size, dtype=np.intp)
+
+    valid = value_codes >= 0
+    pairs = np.unique(codes[valid] * n_distinct + value_codes[valid])
+    return np.bincount(pairs // n_distinct, minlength=size)
+
+
+def period_changes(values):
+    """Cambio absoluto y porcentual de cada fila respecto de la anterior
+
+    values es una matriz (periodos x métricas). Equivale a diff() y
+    pct_change() * 100 por columna con fillna(0): la primera fila y los
+    resultados indefinidos (0/0, datos faltantes) quedan en cero.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    changes = np.zeros_like(values)
+    changes[1:] = np.diff(values, axis=0)
+    rates = np.zeros_like(values)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rates[1:] = changes[1:] / values[:-1] * 100
+
+    changes[np.isnan(changes)] = 0
+    rates[np.isnan(rates)] = 0
+    return changes, rates
@@ -1,6 +1,37 @@
 import pandas as pd
 import numpy as np
 
+from .aggregations import aggregate_by_codes, period_changes
+from .config import MONTH_DTYPE
+
+# Etiqueta de tendencia indexada por (tendencia > 0)
+TREND_LABELS = ('Decreciente', 'Creciente')
+
+
+def build_summary_text(stats):
+    """Genera el texto de resumen del reporte ejecutivo a partir de las estadísticas"""
+    # Mayo a Junio y Junio a Julio por posición, sin depender de las etiquetas
+    revenue_growth = stats['growth_rates']['ingresos']
+    return f"""
+            METRICAS CLAVE DEL PERIODO:
+
+            INGRESOS TOTALES: S/ {stats['total_revenue']:,.2f}
+            TOTAL DE MEMBRESIAS: {stats['total_memberships']}
+            CLIENTES UNICOS: {stats['unique_customers']}
+            TICKET PROMEDIO: S/ {stats['avg_ticket']:,.2f}
+
+            PLANES MAS EXITOSOS:
+            {stats['by_plan_top3_str']}
+
+            CRECIMIENTO MENSUAL:
+            - Mayo a Junio: {revenue_growth.iloc[1]:.1f}%
+            - Junio a Julio: {revenue_growth.iloc[2]:.1f}%
+
+            PROYECCION AGOSTO:
+            - Ingresos estimados: S/ {stats['projections']['agosto_ingresos_estimados']:,.0f}
+            - Tendencia: {stats['projections']['tendencia_ingresos']}
+        """
+
 
 class MembershipAnalytics:
 
@@ -11,9 +42,15 @@ class MembershipAnalytics:
 
     def calculate_all_stats(self):
         """Calcula todas las estadísticas necesarias"""
+        # Resumen mensual indexado por mes, compartido por los cálculos
+        self._monthly_indexed = self.monthly_summary.set_index('month')
+        self._aggregate_plan_months()
+
         self._calculate_general_stats()
         self._calculate_plan_stats()
+        self._calculate_plan_pivots()
         self._calculate_growth_rates()
+        self._calculate_scalars()
         self._calculate_trends()
         self._calculate_projections()
         return self.stats
@@ -27,80 +64,157 @@ class MembershipAnalytics:
 
     def _calculate_plan_stats(self):
         """Calcula estadísticas por plan"""
-        plan_stats = self.combined_df.groupby('membership_plan_name').agg({
-            'amount': ['sum', 'count', 'mean'],
-            'email': 'nunique'
-        }).round(2)
+        plans = self.combined_df['membership_plan_name'].astype('category')
+        categories = plans.cat.categories
+        totals = aggregate_by_codes(
+            plans.cat.codes.to_numpy(), len(categories),
+            self.combined_df['amount'].to_numpy(),
+            self.combined_df['email'].to_numpy()
+        )
+
+        plan_stats = pd.DataFrame({
+            'ingresos': totals['sum'],
+            'cantidad': totals['count'],
+            'ticket_promedio': totals['mean'],
+            'clientes_únicos': totals['nunique']
+        }, index=pd.Index(categories, name='membership_plan_name'))
+        # Sin redondear: se redondea solo al presentar (resumen, exportaciones)
+        plan_stats = plan_stats[totals['observed']]
 
-        plan_stats.columns = ['ingresos', 'cantidad',
-                              'ticket_promedio', 'clientes_únicos']
         self.stats['by_plan'] = plan_stats.sort_values(
             'ingresos', ascending=False)
+        # Tabla de los 3 mejores planes ya formateada para el resumen: se
+        # guarda con las estadísticas (y en la caché) en lugar de
+        # formatearla en cada reporte
+        self.stats['by_plan_top3_str'] = (
+            self.stats['by_plan'].head(3).round(2).to_string()
+        )
+
+    def _aggregate_plan_months(self):
+        """Agrega una sola vez por (plan, mes) para las tablas y el crecimiento"""
+        # Ordenado por plan y, dentro de cada plan, por mes (categoría
+        # ordenada): las tablas y pct_change/diff leen el mismo resultado
+        self._plan_monthly = self.combined_df.groupby(
+            ['membership_plan_name', 'month'], observed=True
+        ).agg(
+            amount_sum=('amount', 'sum'),
+            email_count=('email', 'count'),
+            rows=('month', 'size')
+        )
+
+    def _calculate_plan_pivots(self):
+        """Calcula una sola vez las tablas por plan que usan los gráficos"""
+        plan_monthly = self._plan_monthly
+
+        self.stats['plan_evolution'] = (
+            plan_monthly['amount_sum'].unstack(level=0, fill_value=0)
+        )
+        self.stats['plan_by_month'] = (
+            plan_monthly['rows'].unstack(level=0, fill_value=0)
+        )
+        # Filas por plan sumando la agregación (plan, mes), sin recorrer
+        # combined_df con value_counts; incluye filas con monto nulo
+        self.stats['plan_distribution'] = (
+            plan_monthly['rows'].groupby(level=0, observed=True).sum()
+            .sort_values(ascending=False).rename('count')
+        )
 
     def _calculate_growth_rates(self):
         """Calcula tasas de crecimiento mensual"""
-        monthly_revenue = self.monthly_summary.set_index('month')[
-            'ingresos_total']
-        monthly_memberships = self.monthly_summary.set_index('month')[
-            'total_membresías']
-        monthly_tickets = self.monthly_summary.set_index('month')[
-            'ticket_promedio']
-        monthly_customers = self.monthly_summary.set_index('month')[
-            'clientes_únicos']
-
-        # Tasas de crecimiento porcentual
+        metrics = {
+            'ingresos': 'ingresos_total',
+            'membresias': 'total_membresías',
+            'ticket_promedio': 'ticket_promedio',
+            'clientes_unicos': 'clientes_únicos'
+        }
+        months = self._monthly_indexed.index
+
+        # Una matriz (meses x métricas): diff y pct_change en una sola pasada
+        changes, rates = period_changes(
+            self._monthly_indexed[list(metrics.values())].to_numpy(dtype=np.float64))
+
+        # Tasas de crecimiento porcentual: una Series por métrica, con la
+        # misma forma que las estadísticas de pagos totales
         self.stats['growth_rates'] = {
-            'ingresos': monthly_revenue.pct_change().fillna(0) * 100,
-            'membresias': monthly_memberships.pct_change().fillna(0) * 100,
-            'ticket_promedio': monthly_tickets.pct_change().fillna(0) * 100,
-            'clientes_unicos': monthly_customers.pct_change().fillna(0) * 100
+            metric: pd.Series(rates[:, i], index=months, name=column)
+            for i, (metric, column) in enumerate(metrics.items())
         }
 
         # Cambios absolutos
         self.stats['absolute_changes'] = {
-            'ingresos': monthly_revenue.diff().fillna(0),
-            'membresias': monthly_memberships.diff().fillna(0),
-            'ticket_promedio': monthly_tickets.diff().fillna(0),
-            'clientes_unicos': monthly_customers.diff().fillna(0)
+            metric: pd.Series(changes[:, i], index=months, name=column)
+            for i, (metric, column) in enumerate(metrics.items())
         }
 
+        # Las mismas matrices como tablas (métrica x mes): los gráficos leen
+        # varias métricas y meses con un solo .loc
+        self.stats['growth_rates_df'] = pd.DataFrame(
+            rates.T, index=list(metrics), columns=months)
+        self.stats['absolute_changes_df'] = pd.DataFrame(
+            changes.T, index=list(metrics), columns=months)
+
         # Análisis de crecimiento por planes
         self._calculate_plan_growth()
 
-    def _calculate_plan_growth(self):
-        """Calcula el crecimiento por planes"""
-        plan_evolution = {}
+    def _calculate_scalars(self):
+        """Aplana las tasas y cambios mensuales en floats de Python"""
+        # Los textos del reporte leen estos valores con un lookup de dict en
+        # lugar de indexar una Series de pandas por cada interpolación
+        scalars = {}
+        for prefix, series_by_metric in [('crecimiento', self.stats['growth_rates']),
+                                         ('cambio', self.stats['absolute_changes'])]:
+            for metric, series in series_by_metric.items():
+                for month, value in series.items():
+                    scalars[f'{prefix}_{metric}_{month.lower()}'] = float(value)
 
-        for plan in self.combined_df['membership_plan_name'].unique():
-            plan_data = self.combined_df[self.combined_df['membership_plan_name'] == plan]
-            plan_monthly = plan_data.groupby('month').agg({
-                'amount': 'sum',
-                'email': 'count'
-            })
+        self.stats['scalars'] = scalars
 
-            if len(plan_monthly) > 1:
-                plan_evolution[plan] = {
-                    'revenue_growth': plan_monthly['amount'].pct_change().fillna(0) * 100,
-                    'count_growth': plan_monthly['email'].pct_change().fillna(0) * 100,
-                    'revenue_change': plan_monthly['amount'].diff().fillna(0)
-                }
+    def _calculate_plan_growth(self):
+        """Calcula el crecimiento por planes"""
+        # pct_change y diff por grupo recorren todos los planes a la vez,
+        # cada uno solo sobre sus meses
+        by_plan = self._plan_monthly.groupby(level=0, observed=True)
+        growth = pd.DataFrame({
+            'revenue_growth': by_plan['amount_sum'].pct_change().fillna(0) * 100,
+            'count_growth': by_plan['email_count'].pct_change().fillna(0) * 100,
+            'revenue_change': by_plan['amount_sum'].diff().fillna(0)
+        })
+        months_per_plan = by_plan.size()
+
+        # Solo los planes con más de un mes tienen crecimiento que comparar,
+        # en el orden en que aparecen en los datos
+        plans = [plan for plan in self.combined_df['membership_plan_name'].unique()
+                 if months_per_plan.get(plan, 0) > 1]
+
+        # Series por plan y métrica, solo con los meses de cada plan
+        self.stats['plan_growth'] = {
+            plan: {
+                column: series.rename(plan)
+                for column, series in growth.xs(plan, level=0).items()
+            }
+            for plan in plans
+        }
 
-        self.stats['plan_growth'] = plan_evolution
+        # Las mismas tasas como tablas plan x mes: los gráficos leen un mes de
+        # todos los planes con un solo acceso por columna
+        for column, key in [('revenue_growth', 'plan_revenue_growth_df'),
+                            ('count_growth', 'plan_count_growth_df')]:
+            self.stats[key] = growth[column].unstack(level=1).reindex(
+                index=plans, columns=MONTH_DTYPE.categories)
 
     def _calculate_trends(self):
         """Calcula tendencias y patrones"""
-        monthly_revenue = self.monthly_summary.set_index('month')[
-            'ingresos_total']
-        monthly_memberships = self.monthly_summary.set_index('month')[
-            'total_membresías']
+        monthly_revenue = self._monthly_indexed['ingresos_total']
+        monthly_memberships = self._monthly_indexed['total_membresías']
+        revenue_growth = self.stats['growth_rates']['ingresos']
 
         self.stats['trends'] = {
             'mejor_mes_ingresos': monthly_revenue.idxmax(),
             'peor_mes_ingresos': monthly_revenue.idxmin(),
             'mejor_mes_membresias': monthly_memberships.idxmax(),
-            'mayor_crecimiento_ingresos': self.stats['growth_rates']['ingresos'].idxmax(),
-            'mayor_caida_ingresos': self.stats['growth_rates']['ingresos'].idxmin(),
-            'promedio_crecimiento_ingresos': self.stats['growth_rates']['ingresos'].mean(),
+            'mayor_crecimiento_ingresos': revenue_growth.idxmax(),
+            'mayor_caida_ingresos': revenue_growth.idxmin(),
+            'promedio_crecimiento_ingresos': revenue_growth.mean(),
             'promedio_crecimiento_membresias': self.stats['growth_rates']['membresias'].mean()
         }
 
@@ -109,68 +223,47 @@ class MembershipAnalytics:
 
     def _get_best_growing_plan(self):
         """Identifica el plan con mejor crecimiento promedio"""
-        best_growth = -float('inf')
-        best_plan = 'N/A'
-
-        for plan, data in self.stats['plan_growth'].items():
-            if len(data['revenue_growth']) > 0:
-                avg_growth = data['revenue_growth'].mean()
-                if avg_growth > best_growth:
-                    best_growth = avg_growth
-                    best_plan = plan
+        # Promedio por plan sobre sus meses (los meses sin datos son NaN);
+        # en empate gana el primer plan en aparecer
+        average_growth = self.stats['plan_revenue_growth_df'].mean(axis=1)
+        if average_growth.isna().all():
+            return 'N/A'
 
-        return best_plan
+        return average_growth.idxmax()
 
     def _calculate_projections(self):
         """Calcula proyecciones para el siguiente mes"""
-        monthly_revenue = self.monthly_summary.set_index('month')[
-            'ingresos_total']
-        monthly_memberships = self.monthly_summary.set_index('month')[
-            'total_membresías']
+        revenue = self._monthly_indexed['ingresos_total'].to_numpy()
+        memberships = self._monthly_indexed['total_membresías'].to_numpy()
 
-        if len(monthly_revenue) >= 2:
+        if len(revenue) >= 2:
             # Proyección basada en tendencia lineal simple
-            revenue_trend = monthly_revenue.iloc[-1] - monthly_revenue.iloc[-2]
-            membership_trend = monthly_memberships.iloc[-1] - \
-                monthly_memberships.iloc[-2]
+            revenue_estimate, revenue_trend, revenue_ma = self._project_next(
+                revenue)
+            membership_estimate, membership_trend, membership_ma = self._project_next(
+                memberships)
 
             self.stats['projections'] = {
-                'agosto_ingresos_estimados': monthly_revenue.iloc[-1] + revenue_trend,
-                'agosto_membresias_estimadas': monthly_memberships.iloc[-1] + membership_trend,
-                'tendencia_ingresos': 'Creciente' if revenue_trend > 0 else 'Decreciente',
-                'tendencia_membresias': 'Creciente' if membership_trend > 0 else 'Decreciente'
+                'agosto_ingresos_estimados': revenue_estimate,
+                'agosto_membresias_estimadas': membership_estimate,
+                'tendencia_ingresos': TREND_LABELS[bool(revenue_trend > 0)],
+                'tendencia_membresias': TREND_LABELS[bool(membership_trend > 0)]
             }
 
-            # Proyección más sofisticada usando promedio móvil
-            if len(monthly_revenue) >= 3:
-                revenue_ma = monthly_revenue.rolling(window=2).mean().iloc[-1]
-                membership_ma = monthly_memberships.rolling(
-                    window=2).mean().iloc[-1]
-
+            # Proyección más sofisticada usando promedio móvil de 2 meses
+            if len(revenue) >= 3:
                 self.stats['projections']['agosto_ingresos_ma'] = revenue_ma
                 self.stats['projections']['agosto_membresias_ma'] = membership_ma
 
+    @staticmethod
+    def _project_next(values):
+        """Proyecta el siguiente periodo: (estimado, tendencia, promedio móvil)"""
+        trend = values[-1] - values[-2]
+        return values[-1] + trend, trend, values[-2:].mean()
+
     def get_summary_text(self):
         """Genera texto de resumen para el reporte ejecutivo"""
-        return f"""
-            METRICAS CLAVE DEL PERIODO:
-
-            INGRESOS TOTALES: S/ {self.stats['total_revenue']:,.2f}
-            TOTAL DE MEMBRESIAS: {self.stats['total_memberships']}
-            CLIENTES UNICOS: {self.stats['unique_customers']}
-            TICKET PROMEDIO: S/ {self.stats['avg_ticket']:,.2f}
-
-            PLANES MAS EXITOSOS:
-            {self.stats['by_plan'].head(3).to_string()}
-
-            CRECIMIENTO MENSUAL:
-            - Mayo a Junio: {self.stats['growth_rates']['ingresos']['Junio']:.1f}%
-            - Junio a Julio: {self.stats['growth_rates']['ingresos']['Julio']:.1f}%
-
-            PROYECCION AGOSTO:
-            - Ingresos estimados: S/ {self.stats['projections']['agosto_ingresos_estimados']:,.0f}
-            - Tendencia: {self.stats['projections']['tendencia_ingresos']}
-        """
+        return build_summary_text(self.stats)
 
     def get_monthly_comparison_data(self):
         """Retorna datos estructurados para comparación mensual"""
@@ -188,5 +281,5 @@ class MembershipAnalytics:
             'plan_revenue': self.stats['by_plan']['ingresos'],
             'plan_count': self.stats['by_plan']['cantidad'],
             'plan_tickets': self.stats['by_plan']['ticket_promedio'],
-            'plan_distribution': self.combined_df['membership_plan_name'].value_counts()
+            'plan_distribution': self.stats['plan_distribution']
         }
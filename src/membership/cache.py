@@ -0,0 +1,58 @@
+"""
+Módulo para cachear en disco los datos preparados y las estadísticas
+"""
+
+import pickle
+from pathlib import Path
+
+from src.common.cache import DiskCache
+from .config import DEFAULT_DATA_PATH, CACHE_DIR, CACHE_MAX_ENTRIES
+
+# Módulos cuyo código determina el contenido de la caché
+_SOURCE_FILES = [
+    Path(__file__),
+    Path(__file__).with_name('data_loader.py'),
+    Path(__file__).with_name('analytics.py'),
+    Path(__file__).with_name('aggregations.py'),
+    Path(__file__).with_name('config.py')
+]
+
+
+class StatsCache(DiskCache):
+    """Cachea en disco los datos preparados y las estadísticas, indexados por
+    el estado de los CSV"""
+
+    def __init__(self, data_path=DEFAULT_DATA_PATH, cache_dir=CACHE_DIR,
+                 max_entries=CACHE_MAX_ENTRIES):
+        super().__init__(data_path, cache_dir, max_entries, _SOURCE_FILES)
+
+    def load(self, key):
+        """Retorna el contenido cacheado, o None si no existe"""
+        cache_file = self._get_cache_file(key)
+        try:
+            with open(cache_file, 'rb') as f:
+                payload = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Entrada truncada o escrita con otras versiones de pandas/numpy
+            cache_file.unlink(missing_ok=True)
+            return None
+
+        self._touch(key)
+        return payload
+
+    def save(self, key, payload):
+        """Guarda el contenido y elimina las entradas más antiguas"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self._get_cache_file(key), 'wb') as f:
+            pickle.dump(payload, f, protocol=5)
+
+        self._evict()
+
+    def _get_cache_file(self, key):
+        """Retorna la ruta del archivo de caché para una clave"""
+        return self.cache_dir / f"stats_{key}.pkl"
+
+    def _get_entry_files(self, key):
+        return [self._get_cache_file(key)]
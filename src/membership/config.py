@@ -2,12 +2,37 @@
 Configuraciones y constantes para el análisis de membresías
 """
 
-import matplotlib.pyplot as plt
-import seaborn as sns
+from importlib.util import find_spec
+
+import pandas as pd
 
 # Configuración de rutas
 DEFAULT_DATA_PATH = "data/membership/"
 DEFAULT_OUTPUT_PATH = "reporte_membresias_completo.pdf"
+DEFAULT_EXCEL_PATH = "datos_membresias_detallados.xlsx"
+DEFAULT_PARQUET_DIR = "datos_membresias_parquet/"
+
+# Tamaño del buffer de escritura del PDF (1 MiB)
+PDF_BUFFER_SIZE = 1 << 20
+
+# Cantidad de mensajes de estado que se acumulan antes de escribir a stdout
+LOG_BUFFER_CAPACITY = 256
+
+# Configuración de caché de estadísticas
+CACHE_DIR = ".cache/membership/"
+CACHE_MAX_ENTRIES = 8
+
+# Motor de lectura CSV: PyArrow (parser multihilo en C++) si está instalado
+CSV_ENGINE = 'pyarrow' if find_spec('pyarrow') is not None else 'c'
+
+# Motor de escritura Excel: XlsxWriter en modo constant_memory escribe fila a
+# fila y libera cada una al disco; openpyxl arma toda la hoja en memoria
+if find_spec('xlsxwriter') is not None:
+    EXCEL_ENGINE = 'xlsxwriter'
+    EXCEL_ENGINE_KWARGS = {'options': {'constant_memory': True}}
+else:
+    EXCEL_ENGINE = 'openpyxl'
+    EXCEL_ENGINE_KWARGS = {}
 
 # Configuración de meses
 MONTHS = ['mayo', 'junio', 'julio']
@@ -16,10 +41,8 @@ MONTH_NAMES = {
     'junio': 'Junio',
     'julio': 'Julio'
 }
-
-# Configuración de estilos visuales
-plt.style.use('seaborn-v0_8-darkgrid')
-sns.set_palette("husl")
+MONTH_DTYPE = pd.CategoricalDtype(
+    [MONTH_NAMES[month] for month in MONTHS], ordered=True)
 
 # Colores para gráficos
 COLORS = {
@@ -40,6 +63,65 @@ FONT_SIZES = {
     'tiny': 9
 }
 
+# Propiedades de fuente en negrita por tamaño, creadas una sola vez en
+# configure_plots(); los textos las reciben en lugar de fontweight/fontsize
+BOLD_FONTS = {}
+
+# Backend de matplotlib: no interactivo, el reporte solo se escribe a PDF.
+# Para mostrar los gráficos en pantalla, asignar otro backend (por ejemplo
+# 'TkAgg') antes de la primera llamada a configure_plots()
+PLOT_BACKEND = 'Agg'
+
+# Indica si configure_plots() ya se ejecutó en este proceso
+_plots_configured = False
+
+
+def configure_plots():
+    """Importa matplotlib y aplica el estilo de los gráficos
+
+    matplotlib solo se necesita para el PDF: cargar datos, calcular
+    estadísticas o exportar a Excel no paga su importación. Llamarla más de
+    una vez no hace nada.
+    """
+    global _plots_configured
+    if _plots_configured:
+        return
+
+    import matplotlib
+    # Se fija antes de importar pyplot, así nunca se cargan librerías de GUI
+    matplotlib.use(PLOT_BACKEND, force=True)
+    import matplotlib.pyplot as plt
+    from cycler import cycler
+    from matplotlib.font_manager import FontProperties
+
+    # Configuración de estilos visuales
+    plt.style.use('seaborn-v0_8-darkgrid')
+
+    # Paleta "husl" de 6 colores precalculada: evita importar seaborn solo para
+    # fijar el ciclo de colores
+    plt.rcParams['axes.prop_cycle'] = cycler(color=[
+        '#f77189', '#bb9832', '#50b131', '#36ada4', '#3ba3ec', '#e866f4'
+    ])
+
+    # Salida PDF: compresión zlib explícita y simplificación de trazos, de modo
+    # que cada página se serializa con menos vértices y en menos bytes
+    plt.rcParams.update({
+        'pdf.compression': 6,
+        'path.simplify': True,
+        'path.simplify_threshold': 1.0,
+        # Nunca delegar el texto a LaTeX (evita buscar una instalación externa)
+        'text.usetex': False
+    })
+
+    # Se llenan después de aplicar el estilo, en el mismo diccionario que ya
+    # importaron los demás módulos
+    BOLD_FONTS.update({
+        name: FontProperties(weight='bold', size=size)
+        for name, size in FONT_SIZES.items()
+    })
+    _plots_configured = True
+
+
 # Configuración de grid
 GRID_CONFIG = {
     'hspace': 0.3,
@@ -53,6 +135,7 @@ MESSAGES = {
     'loading_error': "No se encontro: {file_path}",
     'pdf_generating': "Generando reporte PDF...",
     'pdf_success': "Reporte generado exitosamente: {output_file}",
+    'cache_hit': "Datos y estadisticas recuperados de cache: {cache_key}",
     'analysis_start': "Iniciando analisis de membresias...",
     'analysis_complete': "Analisis completado!"
 }
@@ -2,8 +2,26 @@
 Módulo para cargar y preparar datos de membresías
 """
 
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pandas as pd
-from .config import DEFAULT_DATA_PATH, MONTHS, MONTH_NAMES, MESSAGES
+from pandas.api.types import is_numeric_dtype
+from .aggregations import aggregate_by_codes
+from .config import (
+    DEFAULT_DATA_PATH, CSV_ENGINE, MONTHS, MONTH_NAMES, MONTH_DTYPE, MESSAGES
+)
+
+if CSV_ENGINE == 'pyarrow':
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+logger = logging.getLogger(__name__)
+
+# Columnas de baja cardinalidad: se leen y se guardan como categorías
+CATEGORY_COLUMNS = ['membership_plan_name', 'relatedEntityType']
 
 
 class DataLoader:
@@ -14,58 +32,191 @@ class DataLoader:
         self.dfs = {}
         self.combined_df = None
         self.monthly_summary = None
+        # Lecturas crudas por mes (Tablas Arrow o DataFrames) hasta combinarlas
+        self._frames = {}
 
     def load_data(self):
-        """Carga los datos de los 3 meses"""
+        """Carga los datos de los 3 meses leyendo los archivos en paralelo"""
+        file_paths = {
+            month: os.path.join(self.data_path, f"membership-{month}.csv")
+            for month in MONTHS
+        }
+        # Las columnas categóricas se codifican al parsear, sin crear un
+        # string por fila; el resto de columnas se infiere como antes
+        if CSV_ENGINE == 'pyarrow':
+            read_csv = pa_csv.read_csv
+            read_kwargs = {'convert_options': pa_csv.ConvertOptions(column_types={
+                column: pa.dictionary(pa.int32(), pa.string())
+                for column in CATEGORY_COLUMNS
+            })}
+        else:
+            read_csv = pd.read_csv
+            read_kwargs = {'dtype': dict.fromkeys(CATEGORY_COLUMNS, 'category')}
+
+        # Tanto el parser C de pandas como PyArrow liberan el GIL, así que
+        # los hilos solapan la lectura; los resultados se recogen en orden
+        with ThreadPoolExecutor(max_workers=len(MONTHS)) as executor:
+            futures = {
+                month: executor.submit(read_csv, file_path, **read_kwargs)
+                for month, file_path in file_paths.items()
+            }
+
         for month in MONTHS:
-            file_path = f"{self.data_path}membership-{month}.csv"
+            file_path = file_paths[month]
             try:
-                df = pd.read_csv(file_path)
-                df['month'] = MONTH_NAMES[month]
-                df['month_order'] = MONTHS.index(month) + 1
-                self.dfs[month] = df
-                print(MESSAGES['loading_success'].format(
-                    file_path=file_path, records=len(df)
+                frame = futures[month].result()
+                self._frames[month] = frame
+                logger.info(MESSAGES['loading_success'].format(
+                    file_path=file_path, records=len(frame)
                 ))
             except FileNotFoundError:
-                print(MESSAGES['loading_error'].format(file_path=file_path))
+                logger.warning(MESSAGES['loading_error'].format(file_path=file_path))
 
     def prepare_data(self):
         """Prepara y combina los datos"""
-        if not self.dfs:
+        if not self._frames:
             raise ValueError(
                 "No se cargaron datos. Ejecuta load_data() primero.")
 
-        # Combinar todos los dataframes
-        self.combined_df = pd.concat(self.dfs.values(), ignore_index=True)
+        months = list(self._frames)
+        lengths = [len(frame) for frame in self._frames.values()]
 
-        # Limpiar y estandarizar datos
-        self.combined_df['membership_plan_name'] = (
-            self.combined_df['membership_plan_name'].str.strip()
-        )
-        self.combined_df['amount'] = pd.to_numeric(
-            self.combined_df['amount'], errors='coerce'
-        )
+        # Combinar todos los meses
+        self.combined_df = self._concat_frames()
+        self._add_month_columns(months, lengths)
+
+        # Limpiar y estandarizar datos. Los nombres de plan se limpian sobre
+        # las categorías (unos pocos valores únicos) en lugar de fila por fila
+        plans = self.combined_df['membership_plan_name'].astype('category')
+        self.combined_df['membership_plan_name'] = plans.map(str.strip)
+
+        # El parser ya infiere float64 cuando todos los montos son válidos
+        if not is_numeric_dtype(self.combined_df['amount']):
+            self.combined_df['amount'] = pd.to_numeric(
+                self.combined_df['amount'], errors='coerce'
+            )
+        self._downcast()
+        self._share_monthly_frames(months, lengths)
 
         # Crear resumen por mes
         self._create_monthly_summary()
 
+    def restore(self, combined_df, monthly_summary):
+        """Recupera datos ya preparados, por ejemplo desde la caché en disco"""
+        self.combined_df = combined_df
+        self.monthly_summary = monthly_summary
+
+        # Meses presentes y filas de cada uno, en el orden del DataFrame
+        counts = np.bincount(combined_df['month_order'].to_numpy(),
+                             minlength=len(MONTHS) + 1)[1:]
+        months = [month for month, count in zip(MONTHS, counts) if count]
+        lengths = [int(count) for count in counts if count]
+        self._share_monthly_frames(months, lengths)
+
+    def _concat_frames(self):
+        """Combina las lecturas mensuales en un solo DataFrame"""
+        frames = list(self._frames.values())
+        self._frames = {}
+
+        if CSV_ENGINE != 'pyarrow':
+            return pd.concat(frames, ignore_index=True)
+
+        # concat_tables solo encadena los chunks sin copiarlos; la conversión
+        # a pandas se hace una sola vez y self_destruct libera cada columna
+        # Arrow apenas se convierte, sin mantener ambas copias completas
+        table = pa.concat_tables(
+            self._align_types(frames), promote_options='permissive')
+        del frames
+        return table.to_pandas(self_destruct=True, split_blocks=True)
+
+    @staticmethod
+    def _align_types(tables):
+        """Unifica los tipos de columna entre meses antes de concatenar"""
+        # Si un archivo trae valores no numéricos en una columna que en otro
+        # es numérica, ambas se leen como texto; luego prepare_data las
+        # convierte con to_numeric(errors='coerce') como con pandas
+        column_types = {}
+        for table in tables:
+            for field in table.schema:
+                column_types.setdefault(field.name, set()).add(field.type)
+
+        # Las columnas vacías (tipo null) se promueven solas al concatenar
+        conflicting = [name for name, types in column_types.items()
+                       if len(types - {pa.null()}) > 1]
+        if not conflicting:
+            return tables
+
+        aligned = []
+        for table in tables:
+            for name in conflicting:
+                if name in table.column_names:
+                    index = table.column_names.index(name)
+                    table = table.set_column(
+                        index, name, table.column(name).cast(pa.string()))
+            aligned.append(table)
+        return aligned
+
+    def _add_month_columns(self, months, lengths):
+        """Agrega el mes y su orden a partir de la cantidad de filas por mes"""
+        codes = np.repeat(
+            np.array([MONTHS.index(month) for month in months], dtype=np.int8),
+            lengths
+        )
+        # Mes como categoría ordenada: códigos int8 en lugar de strings
+        # repetidos, y los groupby por mes siguen el orden cronológico
+        self.combined_df['month'] = pd.Categorical.from_codes(
+            codes, dtype=MONTH_DTYPE)
+        self.combined_df['month_order'] = (codes + 1).astype(np.uint8)
+
+    def _downcast(self):
+        """Reduce los tipos de datos antes de agregar"""
+        # Columnas de baja cardinalidad: códigos enteros en lugar de strings
+        for column in CATEGORY_COLUMNS:
+            values = self.combined_df[column].astype('category')
+            # Categorías en orden alfabético, como al convertir desde texto,
+            # aunque el parser las haya codificado en orden de aparición
+            self.combined_df[column] = values.cat.reorder_categories(
+                sorted(values.cat.categories))
+
+    def _share_monthly_frames(self, months, lengths):
+        """Expone cada mes como una vista del DataFrame combinado"""
+        # Cada mes ocupa un rango contiguo de filas tras el concat, así que
+        # un slice posicional evita mantener en memoria una segunda copia
+        self.dfs = {}
+        start = 0
+        for month, length in zip(months, lengths):
+            stop = start + length
+            self.dfs[month] = self.combined_df.iloc[start:stop]
+            start = stop
+
     def _create_monthly_summary(self):
         """Crea el resumen mensual"""
-        self.monthly_summary = self.combined_df.groupby(['month', 'month_order']).agg({
-            'amount': ['sum', 'mean', 'count'],
-            'email': 'nunique'
-        }).round(2)
-
-        self.monthly_summary.columns = [
-            'ingresos_total', 'ticket_promedio', 'total_membresías', 'clientes_únicos'
-        ]
+        # month_order va de 1 a len(MONTHS), así que sirve directo como código
+        totals = aggregate_by_codes(
+            self.combined_df['month_order'].to_numpy() - 1, len(MONTHS),
+            self.combined_df['amount'].to_numpy(),
+            self.combined_df['email'].to_numpy()
+        )
+
+        # Conteos en enteros de 32 bits y el orden en uint8, como month_order
+        # en combined_df; los montos siguen en float64, porque float32 no
+        # representa exactamente los céntimos y el error crece con las sumas
+        monthly_summary = pd.DataFrame({
+            'month': [MONTH_NAMES[month] for month in MONTHS],
+            'month_order': np.arange(1, len(MONTHS) + 1, dtype=np.uint8),
+            'ingresos_total': totals['sum'],
+            'ticket_promedio': totals['mean'],
+            'total_membresías': totals['count'].astype(np.int32),
+            'clientes_únicos': totals['nunique'].astype(np.int32)
+        })
+        # Sin redondear: las tasas de crecimiento usan la precisión completa
+        # y los montos se redondean solo al presentarlos
         self.monthly_summary = (
-            self.monthly_summary.reset_index().sort_values('month_order')
+            monthly_summary[totals['observed']].reset_index(drop=True)
         )
 
     def get_data(self):
-        """Retorna los datos procesados"""
+        """Retorna los datos procesados (referencias, sin copiar los DataFrames)"""
         if self.combined_df is None:
             raise ValueError(
                 "Los datos no han sido preparados. Ejecuta prepare_data() primero.")
@@ -76,8 +227,12 @@ class DataLoader:
             'individual_dfs': self.dfs
         }
 
-    def validate_data(self):
-        """Valida que los datos estén correctamente cargados"""
+    def validate_data(self, fail_fast=False):
+        """Valida que los datos estén correctamente cargados
+
+        Todas las verificaciones son operaciones vectorizadas por columna.
+        Con fail_fast=True se detiene en el primer problema encontrado.
+        """
         issues = []
 
         if self.combined_df is None:
@@ -90,14 +245,20 @@ class DataLoader:
                            if col not in self.combined_df.columns]
         if missing_columns:
             issues.append(f"Columnas faltantes: {missing_columns}")
+            if fail_fast:
+                return issues
 
-        # Verificar datos nulos en amount
-        null_amounts = self.combined_df['amount'].isnull().sum()
-        if null_amounts > 0:
-            issues.append(f"{null_amounts} valores nulos en 'amount'")
+        # Verificar datos nulos en las columnas requeridas, en una sola pasada
+        present_columns = [col for col in required_columns
+                           if col not in missing_columns]
+        null_counts = self.combined_df[present_columns].isna().sum()
+        for column, null_count in null_counts[null_counts > 0].items():
+            issues.append(f"{null_count} valores nulos en '{column}'")
+            if fail_fast:
+                return issues
 
         # Verificar que hay datos para los 3 meses
-        unique_months = self.combined_df['month'].nunique()
+        unique_months = self.combined_df['month_order'].nunique()
         if unique_months != 3:
             issues.append(f"Solo hay datos para {unique_months} meses")
 
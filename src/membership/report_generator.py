@@ -1,13 +1,30 @@
 
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages
+import logging
+from pathlib import Path
+
 import pandas as pd
 from .config import (
     FIGURE_SIZE, REPORT_TITLES, MESSAGES,
-    FONT_SIZES, DEFAULT_OUTPUT_PATH
+    FONT_SIZES, DEFAULT_OUTPUT_PATH, DEFAULT_EXCEL_PATH, DEFAULT_PARQUET_DIR,
+    PDF_BUFFER_SIZE, EXCEL_ENGINE, EXCEL_ENGINE_KWARGS, configure_plots
 )
+from .analytics import build_summary_text
 from .visualizations import MembershipVisualizations
 
+logger = logging.getLogger(__name__)
+
+# Recuadro del texto del resumen ejecutivo
+_SUMMARY_BBOX = dict(boxstyle="round,pad=0.5", facecolor="lightblue", alpha=0.5)
+
+def _format_soles(values):
+    """Formatea una columna de montos como 'S/ 1,234' para las tablas"""
+    return [f'S/ {value:,.0f}' for value in values.tolist()]
+
+
+def _format_counts(values):
+    """Convierte una columna de enteros a texto para las tablas"""
+    return [str(value) for value in values.tolist()]
+
 
 class ReportGenerator:
 
@@ -18,110 +35,87 @@ class ReportGenerator:
         self.visualizations = MembershipVisualizations(
             combined_df, monthly_summary, stats)
 
+    # Páginas del reporte, en orden
+    PAGES = [
+        '_create_executive_summary_page',
+        '_create_monthly_comparison_page',
+        '_create_plan_analysis_page',
+        '_create_growth_overview_page',
+        '_create_monthly_growth_page',
+        '_create_plan_growth_page',
+        '_create_detailed_tables_page'
+    ]
+
     def generate_pdf_report(self, output_file=DEFAULT_OUTPUT_PATH):
         """Genera el reporte PDF completo"""
-        print(MESSAGES['pdf_generating'])
-
-        with PdfPages(output_file) as pdf:
-            self._create_executive_summary_page(pdf)
-
-            self._create_monthly_comparison_page(pdf)
-
-            self._create_plan_analysis_page(pdf)
+        logger.info(MESSAGES['pdf_generating'])
+        configure_plots()
 
-            self._create_growth_overview_page(pdf)
+        self._write_pages(output_file)
 
-            self._create_monthly_growth_page(pdf)
+        logger.info(MESSAGES['pdf_success'].format(output_file=output_file))
 
-            self._create_plan_growth_page(pdf)
+    def _write_pages(self, output_file):
+        """Renderiza todas las páginas en serie sobre un mismo PdfPages"""
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_pdf import PdfPages
 
-            self._create_detailed_tables_page(pdf)
-
-        print(MESSAGES['pdf_success'].format(output_file=output_file))
-
-    def _create_executive_summary_page(self, pdf):
-        """Crea la página de resumen ejecutivo"""
+        # Una sola figura para todas las páginas: se limpia tras guardar cada una
         fig = plt.figure(figsize=FIGURE_SIZE)
+        try:
+            # Un buffer grande agrupa las escrituras de cada página en pocas llamadas
+            with open(output_file, 'wb', buffering=PDF_BUFFER_SIZE) as output, \
+                    PdfPages(output) as pdf:
+                for page in self.PAGES:
+                    getattr(self, page)(fig)
+                    pdf.savefig(fig, bbox_inches='tight')
+                    fig.clear()
+        finally:
+            plt.close(fig)
+
+    def _create_executive_summary_page(self, fig):
+        """Crea la página de resumen ejecutivo"""
         fig.suptitle(REPORT_TITLES['executive_summary'],
                      fontsize=20, fontweight='bold', y=0.95)
 
-        # Crear texto de resumen usando analytics
-        summary_text = f"""
-            METRICAS CLAVE DEL PERIODO:
-
-            INGRESOS TOTALES: S/ {self.stats['total_revenue']:,.2f}
-            TOTAL DE MEMBRESIAS: {self.stats['total_memberships']}
-            CLIENTES UNICOS: {self.stats['unique_customers']}
-            TICKET PROMEDIO: S/ {self.stats['avg_ticket']:,.2f}
-
-            PLANES MAS EXITOSOS:
-            {self.stats['by_plan'].head(3).to_string()}
-
-            CRECIMIENTO MENSUAL:
-            - Mayo a Junio: {self.stats['growth_rates']['ingresos']['Junio']:.1f}%
-            - Junio a Julio: {self.stats['growth_rates']['ingresos']['Julio']:.1f}%
-
-            PROYECCION AGOSTO:
-            - Ingresos estimados: S/ {self.stats['projections']['agosto_ingresos_estimados']:,.0f}
-            - Tendencia: {self.stats['projections']['tendencia_ingresos']}
-        """
-
-        plt.text(0.05, 0.85, summary_text, fontsize=FONT_SIZES['normal'],
-                 fontfamily='serif', verticalalignment='top',
-                 transform=fig.transFigure,
-                 bbox=dict(boxstyle="round,pad=0.5", facecolor="lightblue", alpha=0.5))
+        # Mismo texto que MembershipAnalytics.get_summary_text
+        summary_text = build_summary_text(self.stats)
 
-        plt.axis('off')
-        pdf.savefig(fig, bbox_inches='tight')
-        plt.close()
+        # Página solo de texto: un Text a nivel de figura, sin Axes
+        fig.text(0.05, 0.85, summary_text, fontsize=FONT_SIZES['normal'],
+                 fontfamily='serif', verticalalignment='top', bbox=_SUMMARY_BBOX)
 
-    def _create_monthly_comparison_page(self, pdf):
-        fig = plt.figure(figsize=FIGURE_SIZE)
+    def _create_monthly_comparison_page(self, fig):
         fig.suptitle(REPORT_TITLES['monthly_comparison'],
                      fontsize=FONT_SIZES['title'], fontweight='bold')
 
         self.visualizations.create_monthly_comparison_page(fig)
-        pdf.savefig(fig, bbox_inches='tight')
-        plt.close()
 
-    def _create_plan_analysis_page(self, pdf):
-        fig = plt.figure(figsize=FIGURE_SIZE)
+    def _create_plan_analysis_page(self, fig):
         fig.suptitle(REPORT_TITLES['plan_analysis'],
                      fontsize=FONT_SIZES['title'], fontweight='bold')
 
         self.visualizations.create_plan_analysis_page(fig)
-        pdf.savefig(fig, bbox_inches='tight')
-        plt.close()
 
-    def _create_growth_overview_page(self, pdf):
-        fig = plt.figure(figsize=FIGURE_SIZE)
+    def _create_growth_overview_page(self, fig):
         fig.suptitle(REPORT_TITLES['growth_overview'],
                      fontsize=FONT_SIZES['title'], fontweight='bold')
 
         self.visualizations.create_growth_overview_page(fig)
-        pdf.savefig(fig, bbox_inches='tight')
-        plt.close()
 
-    def _create_monthly_growth_page(self, pdf):
-        fig = plt.figure(figsize=FIGURE_SIZE)
+    def _create_monthly_growth_page(self, fig):
         fig.suptitle(REPORT_TITLES['monthly_growth'],
                      fontsize=FONT_SIZES['title'], fontweight='bold')
 
         self.visualizations.create_monthly_growth_page(fig)
-        pdf.savefig(fig, bbox_inches='tight')
-        plt.close()
 
-    def _create_plan_growth_page(self, pdf):
-        fig = plt.figure(figsize=FIGURE_SIZE)
+    def _create_plan_growth_page(self, fig):
         fig.suptitle(REPORT_TITLES['plan_growth'],
                      fontsize=FONT_SIZES['title'], fontweight='bold')
 
         self.visualizations.create_plan_growth_page(fig)
-        pdf.savefig(fig, bbox_inches='tight')
-        plt.close()
 
-    def _create_detailed_tables_page(self, pdf):
-        fig = plt.figure(figsize=FIGURE_SIZE)
+    def _create_detailed_tables_page(self, fig):
         fig.suptitle(REPORT_TITLES['detailed_data'],
                      fontsize=FONT_SIZES['title'], fontweight='bold')
 
@@ -129,14 +123,19 @@ class ReportGenerator:
         ax.axis('tight')
         ax.axis('off')
 
-        table_data = self.monthly_summary.copy()
-        table_data['ingresos_total'] = table_data['ingresos_total'].apply(
-            lambda x: f'S/ {x:,.0f}')
-        table_data['ticket_promedio'] = table_data['ticket_promedio'].apply(
-            lambda x: f'S/ {x:,.0f}')
+        # Texto de las celdas armado fila a fila desde las columnas, sin
+        # copiar el DataFrame ni formatear con .apply
+        summary = self.monthly_summary
+        cell_text = list(zip(
+            summary['month'].tolist(), _format_counts(summary['month_order']),
+            _format_soles(summary['ingresos_total']),
+            _format_soles(summary['ticket_promedio']),
+            _format_counts(summary['total_membresías']),
+            _format_counts(summary['clientes_únicos'])
+        ))
 
         table = ax.table(
-            cellText=table_data.values,
+            cellText=cell_text,
             colLabels=['Mes', 'Orden', 'Ingresos Totales', 'Ticket Promedio',
                        'Total Membresías', 'Clientes Únicos'],
             cellLoc='center',
@@ -148,17 +147,18 @@ class ReportGenerator:
         table.set_fontsize(FONT_SIZES['tiny'])
         table.scale(1, 2)
 
-        plan_table_data = self.stats['by_plan'].copy()
-        plan_table_data['ingresos'] = plan_table_data['ingresos'].apply(
-            lambda x: f'S/ {x:,.0f}')
-        plan_table_data['ticket_promedio'] = plan_table_data['ticket_promedio'].apply(
-            lambda x: f'S/ {x:,.0f}')
+        by_plan = self.stats['by_plan']
+        plan_cell_text = list(zip(
+            _format_soles(by_plan['ingresos']), _format_counts(by_plan['cantidad']),
+            _format_soles(by_plan['ticket_promedio']),
+            _format_counts(by_plan['clientes_únicos'])
+        ))
 
         table2 = ax.table(
-            cellText=plan_table_data.values,
+            cellText=plan_cell_text,
             colLabels=['Ingresos', 'Cantidad',
                        'Ticket Promedio', 'Clientes Únicos'],
-            rowLabels=plan_table_data.index,
+            rowLabels=by_plan.index.tolist(),
             cellLoc='center',
             loc='center',
             bbox=[0.1, 0.05, 0.8, 0.2]
@@ -168,8 +168,6 @@ class ReportGenerator:
         table2.set_fontsize(FONT_SIZES['tiny'])
         table2.scale(1, 1.5)
 
-        pdf.savefig(fig, bbox_inches='tight')
-        plt.close()
 
     def generate_summary_report(self):
         summary = {
@@ -187,31 +185,49 @@ class ReportGenerator:
 
         return summary
 
-    def export_data_to_excel(self, output_file="datos_membresias_detallados.xlsx"):
-        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+    def _export_tables(self):
+        """Tablas exportadas: nombre -> (DataFrame, incluir índice)"""
+        # Los agregados se guardan sin redondear; se exportan a 2 decimales
+        return {
             # Datos combinados
-            self.combined_df.to_excel(
-                writer, sheet_name='Datos_Completos', index=False)
-
+            'Datos_Completos': (self.combined_df, False),
             # Resumen mensual
-            self.monthly_summary.to_excel(
-                writer, sheet_name='Resumen_Mensual', index=False)
-
+            'Resumen_Mensual': (self.monthly_summary.round(2), False),
             # Estadísticas por plan
-            self.stats['by_plan'].to_excel(
-                writer, sheet_name='Estadisticas_Planes')
-
+            'Estadisticas_Planes': (self.stats['by_plan'].round(2), True),
             # Tasas de crecimiento
-            growth_df = pd.DataFrame(self.stats['growth_rates'])
-            growth_df.to_excel(writer, sheet_name='Tasas_Crecimiento')
-
+            'Tasas_Crecimiento': (pd.DataFrame(self.stats['growth_rates']), True),
             # Cambios absolutos
-            changes_df = pd.DataFrame(self.stats['absolute_changes'])
-            changes_df.to_excel(writer, sheet_name='Cambios_Absolutos')
+            'Cambios_Absolutos': (pd.DataFrame(self.stats['absolute_changes']), True)
+        }
+
+    def export_data_to_excel(self, output_file=DEFAULT_EXCEL_PATH):
+        with pd.ExcelWriter(output_file, engine=EXCEL_ENGINE,
+                            engine_kwargs=EXCEL_ENGINE_KWARGS) as writer:
+            for sheet_name, (table, index) in self._export_tables().items():
+                table.to_excel(writer, sheet_name=sheet_name, index=index)
+
+        logger.info(f"Datos exportados a Excel: {output_file}")
 
-        print(f"Datos exportados a Excel: {output_file}")
+    def export_data_to_parquet(self, output_dir=DEFAULT_PARQUET_DIR):
+        """Exporta las mismas tablas que el Excel, un archivo Parquet por hoja
+
+        Parquet se escribe por columnas en binario (requiere pyarrow), sin
+        serializar cada celda como XML.
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for name, (table, index) in self._export_tables().items():
+            table.to_parquet(output_dir / f"{name}.parquet",
+                             compression='zstd', index=index)
 
-    def validate_report_generation(self):
+        logger.info(f"Datos exportados a Parquet: {output_dir}")
+
+    def validate_report_generation(self, fail_fast=False):
+        """Verifica que haya datos y estadísticas para generar el reporte
+
+        Con fail_fast=True se detiene en el primer problema encontrado.
+        """
         issues = []
 
         # Verificar datos básicos
@@ -224,6 +240,9 @@ class ReportGenerator:
         if not self.stats:
             issues.append("No hay estadísticas calculadas")
 
+        if issues and fail_fast:
+            return issues
+
         # Verificar estadísticas específicas
         required_stats = ['total_revenue',
                           'by_plan', 'growth_rates', 'projections']
@@ -231,6 +250,8 @@ class ReportGenerator:
             stat for stat in required_stats if stat not in self.stats]
         if missing_stats:
             issues.append(f"Estadísticas faltantes: {missing_stats}")
+            if fail_fast:
+                return issues
 
         # Verificar que hay datos para los 3 meses
         if self.monthly_summary is not None:
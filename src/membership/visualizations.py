@@ -2,10 +2,65 @@
 Módulo para crear visualizaciones y gráficos
 """
 
-import matplotlib.pyplot as plt
-import pandas as pd
 import numpy as np
-from .config import COLORS, FONT_SIZES, GRID_CONFIG
+from .config import COLORS, FONT_SIZES, BOLD_FONTS, GRID_CONFIG
+
+
+# Plantillas de los textos de las páginas de crecimiento: solo se formatean
+# los valores de cada reporte
+_GROWTH_SUMMARY_TEMPLATE = """
+CRECIMIENTO TOTAL (Mayo - Julio):
+
+INGRESOS:
+• Crecimiento: {revenue_growth:+.1f}%
+• Cambio: S/ {revenue_change:+,.0f}
+• De S/ {revenue_first:,.0f} a S/ {revenue_last:,.0f}
+
+MEMBRESIAS:
+• Crecimiento: {memberships_growth:+.1f}%
+• Cambio: {memberships_change:+.0f} membresias
+• De {memberships_first} a {memberships_last} membresias
+
+MEJOR MES: {best_month}
+PEOR MES: {worst_month}
+        """
+
+_PROJECTIONS_TEMPLATE = """
+PROYECCIONES AGOSTO:
+
+INGRESOS ESTIMADOS:
+• S/ {agosto_ingresos_estimados:,.0f}
+• Tendencia: {tendencia_ingresos}
+
+MEMBRESIAS ESTIMADAS:
+• {agosto_membresias_estimadas:.0f} membresias
+• Tendencia: {tendencia_membresias}
+
+PROMEDIO CRECIMIENTO:
+• Ingresos: {promedio_crecimiento_ingresos:.1f}% mensual
+• Membresias: {promedio_crecimiento_membresias:.1f}% mensual
+        """
+
+_MONTHLY_DETAILS_TEMPLATE = """
+DETALLES MES A MES:
+
+MAYO → JUNIO:
+• Ingresos: {crecimiento_ingresos_junio:+.1f}%
+• Membresias: {crecimiento_membresias_junio:+.1f}%
+• Ticket Prom: {crecimiento_ticket_promedio_junio:+.1f}%
+• Clientes: {crecimiento_clientes_unicos_junio:+.1f}%
+
+JUNIO → JULIO:
+• Ingresos: {crecimiento_ingresos_julio:+.1f}%
+• Membresias: {crecimiento_membresias_julio:+.1f}%
+• Ticket Prom: {crecimiento_ticket_promedio_julio:+.1f}%
+• Clientes: {crecimiento_clientes_unicos_julio:+.1f}%
+        """
+
+
+def _format_labels(fmt, values):
+    """Formatea todos los valores de un arreglo con un solo map de str.format"""
+    return list(map(fmt.format, np.asarray(values).tolist()))
 
 
 class MembershipVisualizations:
@@ -16,6 +71,26 @@ class MembershipVisualizations:
         self.monthly_summary = monthly_summary
         self.stats = stats
 
+        # Paleta de planes inmutable, compartida por todos los gráficos
+        self._plan_colors = tuple(COLORS['plans'])
+
+        # Columnas del resumen mensual convertidas una sola vez para todos
+        # los gráficos
+        self._ms_months = monthly_summary['month'].tolist()
+        self._ms_revenue = monthly_summary['ingresos_total'].to_numpy()
+        self._ms_memberships = monthly_summary['total_membresías'].to_numpy()
+        self._ms_tickets = monthly_summary['ticket_promedio'].to_numpy()
+
+        # Tablas por plan (meses x planes) calculadas en analytics, convertidas
+        # una sola vez y alineadas a los mismos meses y planes
+        plan_evolution = stats['plan_evolution']
+        self._plan_months = plan_evolution.index.tolist()
+        self._plan_names = plan_evolution.columns.tolist()
+        self._plan_revenue = plan_evolution.to_numpy()
+        self._plan_counts = stats['plan_by_month'].reindex(
+            index=plan_evolution.index, columns=plan_evolution.columns,
+            fill_value=0).to_numpy()
+
     def create_monthly_comparison_page(self, fig):
         """Crea los gráficos de comparación mensual"""
         axes = fig.subplots(2, 2)
@@ -32,67 +107,67 @@ class MembershipVisualizations:
         # 4. Distribución de planes por mes
         self._plot_plan_distribution_by_month(axes[1, 1])
 
-        plt.tight_layout()
+        fig.tight_layout()
 
     def _plot_monthly_revenue(self, ax):
         """Gráfico de ingresos mensuales"""
-        months = self.monthly_summary['month']
-        revenue = self.monthly_summary['ingresos_total']
+        months = self._ms_months
+        revenue = self._ms_revenue
 
         bars = ax.bar(months, revenue, color=COLORS['primary'])
         ax.set_title('Ingresos Totales por Mes',
-                     fontsize=FONT_SIZES['subtitle'], fontweight='bold')
+                     fontproperties=BOLD_FONTS['subtitle'])
         ax.set_ylabel('Ingresos (S/)', fontsize=FONT_SIZES['normal'])
 
         # Agregar valores en las barras
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height + height*0.01,
-                    f'S/ {height:,.0f}', ha='center', va='bottom',
-                    fontweight='bold', fontsize=FONT_SIZES['small'])
+        ax.bar_label(bars, fmt='S/ {:,.0f}', padding=3,
+                     fontproperties=BOLD_FONTS['small'])
 
     def _plot_monthly_memberships(self, ax):
         """Gráfico de número de membresías mensuales"""
-        months = self.monthly_summary['month']
-        memberships = self.monthly_summary['total_membresías']
+        months = self._ms_months
+        memberships = self._ms_memberships
 
         bars = ax.bar(months, memberships, color=COLORS['primary'])
         ax.set_title('Número de Membresías por Mes',
-                     fontsize=FONT_SIZES['subtitle'], fontweight='bold')
+                     fontproperties=BOLD_FONTS['subtitle'])
         ax.set_ylabel('Cantidad', fontsize=FONT_SIZES['normal'])
 
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height + height*0.01,
-                    f'{int(height)}', ha='center', va='bottom',
-                    fontweight='bold', fontsize=FONT_SIZES['small'])
+        # Etiquetas enteras convertidas en un solo paso, no barra por barra
+        ax.bar_label(bars, labels=_format_labels(
+            '{:d}', memberships.astype(np.int64)), padding=3,
+            fontproperties=BOLD_FONTS['small'])
 
     def _plot_monthly_tickets(self, ax):
         """Gráfico de ticket promedio mensual"""
-        months = self.monthly_summary['month']
-        tickets = self.monthly_summary['ticket_promedio']
+        months = self._ms_months
+        tickets = self._ms_tickets
 
         bars = ax.bar(months, tickets, color=COLORS['primary'])
         ax.set_title('Ticket Promedio por Mes',
-                     fontsize=FONT_SIZES['subtitle'], fontweight='bold')
+                     fontproperties=BOLD_FONTS['subtitle'])
         ax.set_ylabel('Ticket Promedio (S/)', fontsize=FONT_SIZES['normal'])
 
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height + height*0.01,
-                    f'S/ {height:,.0f}', ha='center', va='bottom',
-                    fontweight='bold', fontsize=FONT_SIZES['small'])
+        ax.bar_label(bars, fmt='S/ {:,.0f}', padding=3,
+                     fontproperties=BOLD_FONTS['small'])
 
     def _plot_plan_distribution_by_month(self, ax):
         """Gráfico de distribución de planes por mes"""
-        plan_by_month = pd.crosstab(
-            self.combined_df['month'],
-            self.combined_df['membership_plan_name']
-        )
-        plan_by_month.plot(kind='bar', ax=ax, stacked=True,
-                           color=COLORS['plans'])
+        values = self._plan_counts
+        positions = np.arange(len(self._plan_months))
+
+        # Barras apiladas: cada plan parte de la suma de los anteriores
+        bottoms = np.zeros(len(self._plan_months))
+        plans_colors = self._plan_colors
+        for j, plan in enumerate(self._plan_names):
+            ax.bar(positions, values[:, j], width=0.5, bottom=bottoms,
+                   color=plans_colors[j % len(plans_colors)], label=plan)
+            bottoms += values[:, j]
+
+        ax.set_xticks(positions, self._plan_months)
+        ax.set_xlim(-0.5, len(self._plan_months) - 0.5)
         ax.set_title('Distribución de Planes por Mes',
-                     fontsize=FONT_SIZES['subtitle'], fontweight='bold')
+                     fontproperties=BOLD_FONTS['subtitle'])
         ax.set_ylabel('Cantidad', fontsize=FONT_SIZES['normal'])
         ax.set_xlabel('Mes', fontsize=FONT_SIZES['normal'])
         ax.legend(title='Plan de Membresía',
@@ -115,7 +190,7 @@ class MembershipVisualizations:
         # 4. Evolución temporal por plan
         self._plot_plan_evolution(axes[1, 1])
 
-        plt.tight_layout()
+        fig.tight_layout()
 
     def _plot_plan_revenue(self, ax):
         """Gráfico horizontal de ingresos por plan"""
@@ -124,14 +199,11 @@ class MembershipVisualizations:
         bars = ax.barh(plan_revenue.index, plan_revenue.values,
                        color=COLORS['secondary'][:len(plan_revenue)])
         ax.set_title('Ingresos por Plan de Membresía',
-                     fontsize=FONT_SIZES['subtitle'], fontweight='bold')
+                     fontproperties=BOLD_FONTS['subtitle'])
         ax.set_xlabel('Ingresos (S/)', fontsize=FONT_SIZES['normal'])
 
-        for i, bar in enumerate(bars):
-            width = bar.get_width()
-            ax.text(width + width*0.01, bar.get_y() + bar.get_height()/2,
-                    f'S/ {width:,.0f}', ha='left', va='center',
-                    fontweight='bold', fontsize=FONT_SIZES['small'])
+        ax.bar_label(bars, fmt='S/ {:,.0f}', padding=3,
+                     fontproperties=BOLD_FONTS['small'])
 
     def _plot_plan_count(self, ax):
         """Gráfico horizontal de cantidad por plan"""
@@ -140,37 +212,39 @@ class MembershipVisualizations:
         bars = ax.barh(plan_count.index, plan_count.values,
                        color=COLORS['secondary'][:len(plan_count)])
         ax.set_title('Cantidad de Membresías por Plan',
-                     fontsize=FONT_SIZES['subtitle'], fontweight='bold')
+                     fontproperties=BOLD_FONTS['subtitle'])
         ax.set_xlabel('Cantidad', fontsize=FONT_SIZES['normal'])
 
-        for i, bar in enumerate(bars):
-            width = bar.get_width()
-            ax.text(width + width*0.01, bar.get_y() + bar.get_height()/2,
-                    f'{int(width)}', ha='left', va='center',
-                    fontweight='bold', fontsize=FONT_SIZES['small'])
+        ax.bar_label(bars, labels=_format_labels(
+            '{:d}', plan_count.to_numpy(dtype=np.int64)), padding=3,
+            fontproperties=BOLD_FONTS['small'])
 
     def _plot_plan_distribution_pie(self, ax):
         """Gráfico circular de distribución de planes"""
-        plan_distribution = self.combined_df['membership_plan_name'].value_counts(
-        )
-        wedges, texts, autotexts = ax.pie(
-            plan_distribution.values,
-            labels=plan_distribution.index,
+        plan_distribution = self.stats['plan_distribution']
+        ax.pie(
+            plan_distribution.to_numpy(),
+            labels=plan_distribution.index.tolist(),
             autopct='%1.1f%%',
-            colors=COLORS['plans'][:len(plan_distribution)],
+            colors=self._plan_colors[:len(plan_distribution)],
             startangle=90
         )
         ax.set_title('Distribución de Planes de Membresía',
-                     fontsize=FONT_SIZES['subtitle'], fontweight='bold')
+                     fontproperties=BOLD_FONTS['subtitle'])
 
     def _plot_plan_evolution(self, ax):
         """Gráfico de evolución temporal por plan"""
-        plan_evolution = self.combined_df.groupby(['month', 'membership_plan_name'])[
-            'amount'].sum().unstack(fill_value=0)
-        plan_evolution.plot(kind='line', ax=ax, marker='o', linewidth=2,
-                            markersize=8, color=COLORS['plans'])
+        months = self._plan_months
+        values = self._plan_revenue
+        plans_colors = self._plan_colors
+
+        # Una sola llamada dibuja una línea por columna (plan)
+        lines = ax.plot(months, values, marker='o', linewidth=2,
+                        markersize=8, label=self._plan_names)
+        for j, line in enumerate(lines):
+            line.set_color(plans_colors[j % len(plans_colors)])
         ax.set_title('Evolución de Ingresos por Plan',
-                     fontsize=FONT_SIZES['subtitle'], fontweight='bold')
+                     fontproperties=BOLD_FONTS['subtitle'])
         ax.set_ylabel('Ingresos (S/)', fontsize=FONT_SIZES['normal'])
         ax.set_xlabel('Mes', fontsize=FONT_SIZES['normal'])
         ax.legend(title='Plan de Membresía',
@@ -187,18 +261,16 @@ class MembershipVisualizations:
         self._plot_main_evolution(ax1)
 
         # 2. Resumen de crecimiento
-        ax2 = fig.add_subplot(gs[1, 0])
-        self._create_growth_summary_text(ax2)
+        self._create_growth_summary_text(fig, gs[1, 0])
 
         # 3. Proyecciones
-        ax3 = fig.add_subplot(gs[1, 1])
-        self._create_projections_text(ax3)
+        self._create_projections_text(fig, gs[1, 1])
 
     def _plot_main_evolution(self, ax):
         """Gráfico principal de evolución con doble eje Y"""
-        months = self.monthly_summary['month'].tolist()
-        revenue = self.monthly_summary['ingresos_total'].tolist()
-        memberships = self.monthly_summary['total_membresías'].tolist()
+        months = self._ms_months
+        revenue = self._ms_revenue
+        memberships = self._ms_memberships
 
         ax_twin = ax.twinx()
 
@@ -206,7 +278,7 @@ class MembershipVisualizations:
         line1 = ax.plot(months, revenue, color='#FF6B6B', marker='o',
                         linewidth=4, markersize=12, label='Ingresos (S/)')
         ax.set_ylabel('Ingresos (S/)', color='#FF6B6B',
-                      fontsize=FONT_SIZES['subtitle'], fontweight='bold')
+                      fontproperties=BOLD_FONTS['subtitle'])
         ax.tick_params(axis='y', labelcolor='#FF6B6B',
                        labelsize=FONT_SIZES['normal'])
 
@@ -214,7 +286,7 @@ class MembershipVisualizations:
         line2 = ax_twin.plot(months, memberships, color='#4ECDC4', marker='s',
                              linewidth=4, markersize=12, label='Membresías')
         ax_twin.set_ylabel('Número de Membresías', color='#4ECDC4',
-                           fontsize=FONT_SIZES['subtitle'], fontweight='bold')
+                           fontproperties=BOLD_FONTS['subtitle'])
         ax_twin.tick_params(axis='y', labelcolor='#4ECDC4',
                             labelsize=FONT_SIZES['normal'])
 
@@ -223,73 +295,65 @@ class MembershipVisualizations:
         ax.grid(True, alpha=0.3)
         ax.tick_params(axis='x', labelsize=FONT_SIZES['normal'])
 
-        # Agregar valores en los puntos
-        for i, (month, rev, mem) in enumerate(zip(months, revenue, memberships)):
-            ax.annotate(f'S/ {rev:,.0f}', (i, rev), textcoords="offset points",
-                        xytext=(0, 20), ha='center', fontweight='bold',
-                        color='#FF6B6B', fontsize=FONT_SIZES['normal'])
-            ax_twin.annotate(f'{mem}', (i, mem), textcoords="offset points",
-                             xytext=(0, -25), ha='center', fontweight='bold',
-                             color='#4ECDC4', fontsize=FONT_SIZES['normal'])
-
-    def _create_growth_summary_text(self, ax):
+        # Agregar valores en los puntos (x categórica: posiciones 0..n-1).
+        # Cada serie se anota en su propio eje leyendo listas de Python ya
+        # formateadas, sin escalares de NumPy por punto
+        for target, values, labels, offset, color in [
+                (ax, revenue.tolist(),
+                 _format_labels('S/ {:,.0f}', revenue), 20, '#FF6B6B'),
+                (ax_twin, memberships.tolist(),
+                 _format_labels('{}', memberships), -25, '#4ECDC4')]:
+            for i in range(len(values)):
+                target.annotate(labels[i], (i, values[i]),
+                                textcoords="offset points", xytext=(0, offset),
+                                ha='center', color=color,
+                                fontproperties=BOLD_FONTS['normal'])
+
+    @staticmethod
+    def _add_cell_text(fig, cell, text, **kwargs):
+        """Escribe un bloque de texto en una celda del grid, sin crear Axes"""
+        # Mismas coordenadas que (0.05, 0.95) en transAxes de un Axes que
+        # ocupara la celda, pero con un solo Text a nivel de figura
+        box = cell.get_position(fig)
+        fig.text(box.x0 + 0.05 * box.width, box.y0 + 0.95 * box.height, text,
+                 verticalalignment='top', **kwargs)
+
+    def _create_growth_summary_text(self, fig, cell):
         """Crea el texto de resumen de crecimiento"""
-        ax.axis('off')
-
-        months = self.monthly_summary['month'].tolist()
-        revenue = self.monthly_summary['ingresos_total'].tolist()
-        memberships = self.monthly_summary['total_membresías'].tolist()
-
-        total_growth_revenue = ((revenue[-1] - revenue[0]) / revenue[0]) * 100
-        total_growth_memberships = (
-            (memberships[-1] - memberships[0]) / memberships[0]) * 100
-        total_change_revenue = revenue[-1] - revenue[0]
-        total_change_memberships = memberships[-1] - memberships[0]
-
-        summary_text = f"""
-CRECIMIENTO TOTAL (Mayo - Julio):
-
-INGRESOS:
-• Crecimiento: {total_growth_revenue:+.1f}%
-• Cambio: S/ {total_change_revenue:+,.0f}
-• De S/ {revenue[0]:,.0f} a S/ {revenue[-1]:,.0f}
-
-MEMBRESIAS:
-• Crecimiento: {total_growth_memberships:+.1f}%
-• Cambio: {total_change_memberships:+.0f} membresias
-• De {memberships[0]} a {memberships[-1]} membresias
-
-MEJOR MES: {self.stats['trends']['mejor_mes_ingresos']}
-PEOR MES: {self.stats['trends']['peor_mes_ingresos']}
-        """
-
-        ax.text(0.05, 0.95, summary_text, fontsize=FONT_SIZES['normal'],
-                fontweight='bold', verticalalignment='top', transform=ax.transAxes,
-                bbox=dict(boxstyle="round,pad=0.5", facecolor="#e8f4fd", alpha=0.9))
-
-    def _create_projections_text(self, ax):
+        revenue = self._ms_revenue
+        memberships = self._ms_memberships
+
+        # Primer y último mes de ambas métricas en una matriz: el cambio y
+        # el crecimiento total salen de una sola resta y una división
+        first, last = np.array([revenue[[0, -1]], memberships[[0, -1]]],
+                               dtype=np.float64).T
+        total_change_revenue, total_change_memberships = last - first
+        with np.errstate(divide='ignore', invalid='ignore'):
+            total_growth_revenue, total_growth_memberships = (
+                (last - first) / first * 100)
+
+        summary_text = _GROWTH_SUMMARY_TEMPLATE.format(
+            revenue_growth=total_growth_revenue,
+            revenue_change=total_change_revenue,
+            revenue_first=revenue[0], revenue_last=revenue[-1],
+            memberships_growth=total_growth_memberships,
+            memberships_change=total_change_memberships,
+            memberships_first=memberships[0], memberships_last=memberships[-1],
+            best_month=self.stats['trends']['mejor_mes_ingresos'],
+            worst_month=self.stats['trends']['peor_mes_ingresos'])
+
+        self._add_cell_text(
+            fig, cell, summary_text, fontproperties=BOLD_FONTS['normal'],
+            bbox=dict(boxstyle="round,pad=0.5", facecolor="#e8f4fd", alpha=0.9))
+
+    def _create_projections_text(self, fig, cell):
         """Crea el texto de proyecciones"""
-        ax.axis('off')
-
-        projection_text = f"""
-PROYECCIONES AGOSTO:
-
-INGRESOS ESTIMADOS:
-• S/ {self.stats['projections']['agosto_ingresos_estimados']:,.0f}
-• Tendencia: {self.stats['projections']['tendencia_ingresos']}
+        projection_text = _PROJECTIONS_TEMPLATE.format_map(
+            {**self.stats['projections'], **self.stats['trends']})
 
-MEMBRESIAS ESTIMADAS:
-• {self.stats['projections']['agosto_membresias_estimadas']:.0f} membresias
-• Tendencia: {self.stats['projections']['tendencia_membresias']}
-
-PROMEDIO CRECIMIENTO:
-• Ingresos: {self.stats['trends']['promedio_crecimiento_ingresos']:.1f}% mensual
-• Membresias: {self.stats['trends']['promedio_crecimiento_membresias']:.1f}% mensual
-        """
-
-        ax.text(0.05, 0.95, projection_text, fontsize=FONT_SIZES['normal'],
-                fontweight='bold', verticalalignment='top', transform=ax.transAxes,
-                bbox=dict(boxstyle="round,pad=0.5", facecolor="#fff2e8", alpha=0.9))
+        self._add_cell_text(
+            fig, cell, projection_text, fontproperties=BOLD_FONTS['normal'],
+            bbox=dict(boxstyle="round,pad=0.5", facecolor="#fff2e8", alpha=0.9))
 
     def create_monthly_growth_page(self, fig):
         """Crea la página de crecimiento mensual detallado"""
@@ -309,30 +373,25 @@ PROMEDIO CRECIMIENTO:
         self._plot_ticket_evolution(ax3)
 
         # 4. Detalles mensuales
-        ax4 = fig.add_subplot(gs[1, 1])
-        self._create_monthly_details_text(ax4)
+        self._create_monthly_details_text(fig, gs[1, 1])
 
     def _plot_growth_rates(self, ax):
         """Gráfico de tasas de crecimiento porcentual"""
-        growth_data = {
-            'Ingresos': [self.stats['growth_rates']['ingresos']['Junio'],
-                         self.stats['growth_rates']['ingresos']['Julio']],
-            'Membresias': [self.stats['growth_rates']['membresias']['Junio'],
-                           self.stats['growth_rates']['membresias']['Julio']]
-        }
+        revenue_growth, membership_growth = self.stats['growth_rates_df'].loc[
+            ['ingresos', 'membresias'], ['Junio', 'Julio']].to_numpy()
 
         x_pos = np.arange(len(['Jun vs May', 'Jul vs Jun']))
         width = 0.35
 
-        bars1 = ax.bar(x_pos - width/2, growth_data['Ingresos'], width,
+        bars1 = ax.bar(x_pos - width/2, revenue_growth, width,
                        label='Ingresos', color='#FF6B6B', alpha=0.8)
-        bars2 = ax.bar(x_pos + width/2, growth_data['Membresias'], width,
+        bars2 = ax.bar(x_pos + width/2, membership_growth, width,
                        label='Membresias', color='#4ECDC4', alpha=0.8)
 
         ax.set_ylabel('Crecimiento (%)',
-                      fontsize=FONT_SIZES['normal'], fontweight='bold')
+                      fontproperties=BOLD_FONTS['normal'])
         ax.set_title('TASAS DE CRECIMIENTO MENSUAL',
-                     fontsize=FONT_SIZES['subtitle'], fontweight='bold')
+                     fontproperties=BOLD_FONTS['subtitle'])
         ax.set_xticks(x_pos)
         ax.set_xticklabels(['Jun vs May', 'Jul vs Jun'],
                            fontsize=FONT_SIZES['small'])
@@ -342,84 +401,55 @@ PROMEDIO CRECIMIENTO:
 
         # Agregar valores en las barras
         for bars in [bars1, bars2]:
-            for bar in bars:
-                height = bar.get_height()
-                ax.annotate(f'{height:.1f}%',
-                            xy=(bar.get_x() + bar.get_width() / 2, height),
-                            xytext=(0, 3 if height >= 0 else -15),
-                            textcoords="offset points",
-                            ha='center', va='bottom' if height >= 0 else 'top',
-                            fontweight='bold', fontsize=FONT_SIZES['tiny'])
+            ax.bar_label(bars, fmt='{:.1f}%', padding=3,
+                         fontproperties=BOLD_FONTS['tiny'])
 
     def _plot_absolute_changes(self, ax):
         """Gráfico de cambios absolutos en ingresos"""
-        revenue_changes = [
-            self.stats['absolute_changes']['ingresos']['Junio'],
-            self.stats['absolute_changes']['ingresos']['Julio']
-        ]
+        revenue_changes = self.stats['absolute_changes_df'].loc[
+            'ingresos', ['Junio', 'Julio']].to_numpy()
         colors = [COLORS['growth_positive'] if x >= 0 else COLORS['growth_negative']
-                  for x in revenue_changes]
+                  for x in revenue_changes.tolist()]
 
         bars = ax.bar(['Jun vs May', 'Jul vs Jun'], revenue_changes,
                       color=colors, alpha=0.7)
         ax.set_ylabel('Cambio Absoluto (S/)',
-                      fontsize=FONT_SIZES['normal'], fontweight='bold')
+                      fontproperties=BOLD_FONTS['normal'])
         ax.set_title('CAMBIO EN INGRESOS (Soles)',
-                     fontsize=FONT_SIZES['subtitle'], fontweight='bold')
+                     fontproperties=BOLD_FONTS['subtitle'])
         ax.axhline(y=0, color='black', linestyle='-', alpha=0.5)
         ax.grid(True, alpha=0.3)
 
-        for bar in bars:
-            height = bar.get_height()
-            ax.annotate(f'S/ {height:,.0f}',
-                        xy=(bar.get_x() + bar.get_width() / 2, height),
-                        xytext=(0, 3 if height >= 0 else -15),
-                        textcoords="offset points",
-                        ha='center', va='bottom' if height >= 0 else 'top',
-                        fontweight='bold', fontsize=FONT_SIZES['tiny'])
+        ax.bar_label(bars, fmt='S/ {:,.0f}', padding=3,
+                     fontproperties=BOLD_FONTS['tiny'])
 
     def _plot_ticket_evolution(self, ax):
         """Gráfico de evolución del ticket promedio"""
-        months = self.monthly_summary['month'].tolist()
-        tickets = self.monthly_summary['ticket_promedio'].tolist()
+        months = self._ms_months
+        tickets = self._ms_tickets
 
         ax.plot(months, tickets, color='#45B7D1', marker='D',
                 linewidth=4, markersize=10)
         ax.set_ylabel('Ticket Promedio (S/)',
-                      fontsize=FONT_SIZES['normal'], fontweight='bold')
+                      fontproperties=BOLD_FONTS['normal'])
         ax.set_title('EVOLUCION TICKET PROMEDIO',
-                     fontsize=FONT_SIZES['subtitle'], fontweight='bold')
+                     fontproperties=BOLD_FONTS['subtitle'])
         ax.grid(True, alpha=0.3)
         ax.tick_params(axis='both', labelsize=FONT_SIZES['small'])
 
-        for i, (month, ticket) in enumerate(zip(months, tickets)):
-            ax.annotate(f'S/ {ticket:,.0f}', (i, ticket),
+        ticket_labels = _format_labels('S/ {:,.0f}', tickets)
+        for i, (ticket, label) in enumerate(zip(tickets, ticket_labels)):
+            ax.annotate(label, (i, ticket),
                         textcoords="offset points", xytext=(0, 15),
-                        ha='center', fontweight='bold', fontsize=FONT_SIZES['small'])
+                        ha='center', fontproperties=BOLD_FONTS['small'])
 
-    def _create_monthly_details_text(self, ax):
+    def _create_monthly_details_text(self, fig, cell):
         """Crea el texto de detalles mensuales"""
-        ax.axis('off')
-
-        details_text = f"""
-DETALLES MES A MES:
+        details_text = _MONTHLY_DETAILS_TEMPLATE.format_map(self.stats['scalars'])
 
-MAYO → JUNIO:
-• Ingresos: {self.stats['growth_rates']['ingresos']['Junio']:+.1f}%
-• Membresias: {self.stats['growth_rates']['membresias']['Junio']:+.1f}%
-• Ticket Prom: {self.stats['growth_rates']['ticket_promedio']['Junio']:+.1f}%
-• Clientes: {self.stats['growth_rates']['clientes_unicos']['Junio']:+.1f}%
-
-JUNIO → JULIO:
-• Ingresos: {self.stats['growth_rates']['ingresos']['Julio']:+.1f}%
-• Membresias: {self.stats['growth_rates']['membresias']['Julio']:+.1f}%
-• Ticket Prom: {self.stats['growth_rates']['ticket_promedio']['Julio']:+.1f}%
-• Clientes: {self.stats['growth_rates']['clientes_unicos']['Julio']:+.1f}%
-        """
-
-        ax.text(0.05, 0.95, details_text, fontsize=FONT_SIZES['small'],
-                fontweight='bold', verticalalignment='top', transform=ax.transAxes,
-                bbox=dict(boxstyle="round,pad=0.5", facecolor="#f0f8e8", alpha=0.9))
+        self._add_cell_text(
+            fig, cell, details_text, fontproperties=BOLD_FONTS['small'],
+            bbox=dict(boxstyle="round,pad=0.5", facecolor="#f0f8e8", alpha=0.9))
 
     def create_plan_growth_page(self, fig):
         """Crea la página de crecimiento por planes"""
@@ -440,89 +470,78 @@ JUNIO → JULIO:
 
     def _plot_plan_revenue_growth(self, ax):
         """Gráfico de crecimiento de ingresos por plan (Julio vs Junio)"""
-        plan_names = []
-        plan_growth_jul = []
-
-        for plan, data in self.stats['plan_growth'].items():
-            if 'Julio' in data['revenue_growth'].index:
-                plan_names.append(plan)
-                plan_growth_jul.append(data['revenue_growth']['Julio'])
+        growth = self.stats['plan_revenue_growth_df']['Julio'].dropna()
+        plan_names = growth.index.tolist()
+        plan_growth_jul = growth.to_numpy()
 
         if plan_names:
             bars = ax.bar(plan_names, plan_growth_jul,
-                          color=COLORS['plans'][:len(plan_names)], alpha=0.8)
+                          color=self._plan_colors[:len(plan_names)], alpha=0.8)
             ax.set_ylabel('Crecimiento Ingresos (%)',
-                          fontsize=FONT_SIZES['normal'], fontweight='bold')
+                          fontproperties=BOLD_FONTS['normal'])
             ax.set_title('CRECIMIENTO INGRESOS POR PLAN\n(Julio vs Junio)',
-                         fontsize=FONT_SIZES['subtitle'], fontweight='bold')
+                         fontproperties=BOLD_FONTS['subtitle'])
             ax.axhline(y=0, color='black', linestyle='-', alpha=0.3)
             ax.grid(True, alpha=0.3)
             ax.tick_params(axis='x', rotation=0, labelsize=FONT_SIZES['small'])
 
-            for bar in bars:
-                height = bar.get_height()
-                ax.annotate(f'{height:.1f}%',
-                            xy=(bar.get_x() + bar.get_width() / 2, height),
-                            xytext=(0, 3 if height >= 0 else -15),
-                            textcoords="offset points",
-                            ha='center', va='bottom' if height >= 0 else 'top',
-                            fontweight='bold', fontsize=FONT_SIZES['small'])
+            ax.bar_label(bars, fmt='{:.1f}%', padding=3,
+                         fontproperties=BOLD_FONTS['small'])
 
     def _plot_plan_count_growth(self, ax):
         """Gráfico de crecimiento de cantidad por plan"""
-        plan_names = []
-        plan_count_growth = []
-
-        for plan, data in self.stats['plan_growth'].items():
-            if 'Julio' in data['count_growth'].index:
-                plan_names.append(plan)
-                plan_count_growth.append(data['count_growth']['Julio'])
+        growth = self.stats['plan_count_growth_df']['Julio'].dropna()
+        plan_names = growth.index.tolist()
+        plan_count_growth = growth.to_numpy()
 
         if plan_names:
             bars = ax.bar(plan_names, plan_count_growth,
-                          color=COLORS['plans'][:len(plan_names)], alpha=0.8)
+                          color=self._plan_colors[:len(plan_names)], alpha=0.8)
             ax.set_ylabel('Crecimiento Cantidad (%)',
-                          fontsize=FONT_SIZES['normal'], fontweight='bold')
+                          fontproperties=BOLD_FONTS['normal'])
             ax.set_title('CRECIMIENTO CANTIDAD POR PLAN\n(Julio vs Junio)',
-                         fontsize=FONT_SIZES['subtitle'], fontweight='bold')
+                         fontproperties=BOLD_FONTS['subtitle'])
             ax.axhline(y=0, color='black', linestyle='-', alpha=0.3)
             ax.grid(True, alpha=0.3)
             ax.tick_params(axis='x', rotation=0, labelsize=FONT_SIZES['small'])
 
-            for bar in bars:
-                height = bar.get_height()
-                ax.annotate(f'{height:.1f}%',
-                            xy=(bar.get_x() + bar.get_width() / 2, height),
-                            xytext=(0, 3 if height >= 0 else -15),
-                            textcoords="offset points",
-                            ha='center', va='bottom' if height >= 0 else 'top',
-                            fontweight='bold', fontsize=FONT_SIZES['small'])
+            ax.bar_label(bars, fmt='{:.1f}%', padding=3,
+                         fontproperties=BOLD_FONTS['small'])
 
     def _plot_plan_temporal_evolution(self, ax):
         """Gráfico de evolución temporal de ingresos por plan"""
-        plan_evolution = self.combined_df.groupby(['month', 'membership_plan_name'])[
-            'amount'].sum().unstack(fill_value=0)
+        months = self._plan_months
+        values = self._plan_revenue
+        plans_colors = self._plan_colors
 
-        for i, plan in enumerate(plan_evolution.columns):
-            ax.plot(plan_evolution.index, plan_evolution[plan],
-                    marker='o', linewidth=3, markersize=8, label=plan,
-                    color=COLORS['plans'][i])
+        # Una sola llamada dibuja una línea por columna (plan)
+        lines = ax.plot(months, values, marker='o', linewidth=3,
+                        markersize=8, label=self._plan_names)
+        for i, line in enumerate(lines):
+            line.set_color(plans_colors[i % len(plans_colors)])
 
         ax.set_title('EVOLUCION DE INGRESOS POR PLAN (Mayo - Julio)',
-                     fontsize=FONT_SIZES['subtitle'], fontweight='bold')
+                     fontproperties=BOLD_FONTS['subtitle'])
         ax.set_ylabel('Ingresos (S/)',
-                      fontsize=FONT_SIZES['normal'], fontweight='bold')
-        ax.set_xlabel('Mes', fontsize=FONT_SIZES['normal'], fontweight='bold')
+                      fontproperties=BOLD_FONTS['normal'])
+        ax.set_xlabel('Mes', fontproperties=BOLD_FONTS['normal'])
         ax.legend(fontsize=FONT_SIZES['small'], loc='upper left')
         ax.grid(True, alpha=0.3)
         ax.tick_params(axis='both', labelsize=FONT_SIZES['small'])
 
-        # Agregar valores en los puntos
-        for i, plan in enumerate(plan_evolution.columns):
-            for j, (month, value) in enumerate(zip(plan_evolution.index, plan_evolution[plan])):
-                if value > 0:
-                    ax.annotate(f'S/ {value:,.0f}', (j, value),
-                                textcoords="offset points",
-                                xytext=(0, 10 + i*15), ha='center',
-                                fontweight='bold', fontsize=FONT_SIZES['tiny'],
-                                color=COLORS['plans'][i])
+        # Agregar valores en los puntos: cada plan se desplaza 15 puntos
+        # más arriba que el anterior para que las etiquetas no se tapen.
+        # Solo se recorren los puntos con valor positivo (plan, mes)
+        by_plan = values.T
+        plan_idx, month_idx = np.nonzero(by_plan > 0)
+        points = by_plan[plan_idx, month_idx]
+        offsets = (10 + 15 * plan_idx).tolist()
+        labels = _format_labels('S/ {:,.0f}', points)
+        for i, j, value, offset, label in zip(plan_idx.tolist(),
+                                              month_idx.tolist(),
+                                              points.tolist(), offsets, labels):
+            ax.annotate(label, (j, value),
+                        textcoords="offset points",
+                        xytext=(0, offset), ha='center',
+                        fontproperties=BOLD_FONTS['tiny'],
+                        color=plans_colors[i % len(plans_colors)])
@@ -7,6 +7,7 @@ from .data_loader import TotalDataLoader
 from .analytics import TotalAnalytics
 from .visualizations import TotalVisualizations
 from .report_generator import TotalReportGenerator
+from .cache import DataCache
 
 __version__ = "1.0.0"
 __author__ = "Tu Nombre"
@@ -15,5 +16,6 @@ __all__ = [
     'TotalDataLoader',
     'TotalAnalytics',
     'TotalVisualizations',
-    'TotalReportGenerator'
+    'TotalReportGenerator',
+    'DataCache'
 ]
@@ -5,6 +5,19 @@ Módulo para análisis y cálculos estadísticos de pagos totales
 import pandas as pd
 import numpy as np
 
+# Niveles de concentración según el índice HHI, indexados por
+# np.searchsorted(CONCENTRATION_THRESHOLDS, hhi)
+CONCENTRATION_THRESHOLDS = (0.25, 0.5)
+CONCENTRATION_LABELS = (
+    'Baja concentración', 'Concentración moderada', 'Alta concentración')
+
+# Peso de cada métrica en el score de rendimiento por categoría
+PERFORMANCE_WEIGHTS = {
+    'ingresos': 0.4,
+    'cantidad': 0.3,
+    'ticket_promedio': 0.3
+}
+
 
 class TotalAnalytics:
     """Maneja todos los cálculos y análisis estadísticos para pagos totales"""
@@ -17,6 +30,8 @@ class TotalAnalytics:
 
     def calculate_all_stats(self):
         """Calcula todas las estadísticas necesarias"""
+        # Resumen mensual indexado por mes, compartido por los cálculos
+        self._monthly_indexed = self.monthly_summary.set_index('month')
         self._calculate_general_stats()
         self._calculate_category_stats()
         self._calculate_growth_rates()
@@ -41,14 +56,24 @@ class TotalAnalytics:
 
     def _calculate_category_stats(self):
         """Calcula estadísticas por categoría"""
-        category_stats = self.combined_df.groupby('category_clean').agg({
-            'amount': ['sum', 'count', 'mean', 'median'],
-            'email': 'nunique'
-        }).round(2)
-
-        category_stats.columns = [
-            'ingresos', 'cantidad', 'ticket_promedio', 'ticket_mediano', 'clientes_únicos'
-        ]
+        # Ingresos y cantidad salen del resumen mensual por categoría; solo
+        # la mediana y los clientes únicos necesitan los datos completos
+        category_stats = self.monthly_category_summary.groupby(
+            'category_clean', observed=True, sort=False)[
+            ['ingresos_total', 'total_transacciones']].sum()
+        category_stats.columns = ['ingresos', 'cantidad']
+        category_stats['ticket_promedio'] = (
+            category_stats['ingresos'] / category_stats['cantidad'])
+
+        category_stats['ticket_mediano'] = self.combined_df.groupby(
+            'category_clean', observed=True, sort=False)['amount'].median()
+
+        # Clientes únicos: pares (categoría, email) deduplicados una sola vez
+        customers = self.combined_df[['category_clean', 'email']].dropna(
+            subset=['email']).drop_duplicates()
+        category_stats['clientes_únicos'] = customers.groupby(
+            'category_clean', observed=True, sort=False
+        ).size().reindex(category_stats.index, fill_value=0)
         self.stats['by_category'] = category_stats.sort_values(
             'ingresos', ascending=False)
 
@@ -60,14 +85,10 @@ class TotalAnalytics:
 
     def _calculate_growth_rates(self):
         """Calcula tasas de crecimiento mensual"""
-        monthly_revenue = self.monthly_summary.set_index('month')[
-            'ingresos_total']
-        monthly_transactions = self.monthly_summary.set_index('month')[
-            'total_transacciones']
-        monthly_tickets = self.monthly_summary.set_index('month')[
-            'ticket_promedio']
-        monthly_customers = self.monthly_summary.set_index('month')[
-            'clientes_únicos']
+        monthly_revenue = self._monthly_indexed['ingresos_total']
+        monthly_transactions = self._monthly_indexed['total_transacciones']
+        monthly_tickets = self._monthly_indexed['ticket_promedio']
+        monthly_customers = self._monthly_indexed['clientes_únicos']
 
         # Tasas de crecimiento porcentual
         self.stats['growth_rates'] = {
@@ -87,33 +108,39 @@ class TotalAnalytics:
 
     def _calculate_category_growth(self):
         """Calcula el crecimiento por categorías"""
-        category_growth = {}
+        # pct_change por grupo recorre todas las categorías a la vez, cada
+        # una solo sobre sus meses en orden
+        summary = self.monthly_category_summary.sort_values(
+            ['category_clean', 'month_order']).set_index(['category_clean', 'month'])
+        by_category = summary.groupby(level=0, observed=True, sort=False)
+        growth = pd.DataFrame({
+            'revenue_growth': by_category['ingresos_total'].pct_change().fillna(0) * 100,
+            'count_growth': by_category['total_transacciones'].pct_change().fillna(0) * 100
+        })
+        months_per_category = by_category.size()
+
+        # Solo las categorías con más de un mes tienen crecimiento que comparar
+        multi_month = growth.index.get_level_values(0).isin(
+            months_per_category.index[months_per_category > 1])
+        self._revenue_growth_by_category = growth.loc[multi_month, 'revenue_growth']
 
+        category_growth = {}
         for category in self.combined_df['category_clean'].unique():
-            cat_data = self.monthly_category_summary[
-                self.monthly_category_summary['category_clean'] == category
-            ]
-
-            if len(cat_data) > 1:
-                cat_data_sorted = cat_data.sort_values('month_order')
-                revenue_growth = cat_data_sorted.set_index(
-                    'month')['ingresos_total'].pct_change().fillna(0) * 100
-                count_growth = cat_data_sorted.set_index(
-                    'month')['total_transacciones'].pct_change().fillna(0) * 100
-
+            if months_per_category.get(category, 0) > 1:
+                category_data = growth.xs(category, level=0)
                 category_growth[category] = {
-                    'revenue_growth': revenue_growth,
-                    'count_growth': count_growth
+                    'revenue_growth': category_data['revenue_growth'].rename(
+                        'ingresos_total'),
+                    'count_growth': category_data['count_growth'].rename(
+                        'total_transacciones')
                 }
 
         self.stats['category_growth'] = category_growth
 
     def _calculate_trends(self):
         """Calcula tendencias y patrones"""
-        monthly_revenue = self.monthly_summary.set_index('month')[
-            'ingresos_total']
-        monthly_transactions = self.monthly_summary.set_index('month')[
-            'total_transacciones']
+        monthly_revenue = self._monthly_indexed['ingresos_total']
+        monthly_transactions = self._monthly_indexed['total_transacciones']
 
         self.stats['trends'] = {
             'mejor_mes_ingresos': monthly_revenue.idxmax(),
@@ -130,22 +157,18 @@ class TotalAnalytics:
 
     def _get_best_growing_category(self):
         """Identifica la categoría con mejor crecimiento promedio"""
-        best_growth = -float('inf')
-        best_category = 'N/A'
-
-        for category, data in self.stats['category_growth'].items():
-            if len(data['revenue_growth']) > 0:
-                avg_growth = data['revenue_growth'].mean()
-                if avg_growth > best_growth:
-                    best_growth = avg_growth
-                    best_category = category
+        # Promedio por categoría en una sola reducción; en empate gana la
+        # primera categoría en aparecer, igual que al recorrer category_growth
+        average_growth = self._revenue_growth_by_category.groupby(
+            level=0, observed=True).mean().reindex(list(self.stats['category_growth']))
+        if average_growth.isna().all():
+            return 'N/A'
 
-        return best_category
+        return average_growth.idxmax()
 
     def _analyze_seasonality(self):
         """Analiza patrones estacionales"""
-        monthly_data = self.monthly_summary.set_index('month')[
-            'ingresos_total']
+        monthly_data = self._monthly_indexed['ingresos_total']
 
         # Calcular variabilidad
         cv = (monthly_data.std() / monthly_data.mean()) * 100
@@ -167,10 +190,8 @@ class TotalAnalytics:
 
     def _calculate_projections(self):
         """Calcula proyecciones para el siguiente mes"""
-        monthly_revenue = self.monthly_summary.set_index('month')[
-            'ingresos_total']
-        monthly_transactions = self.monthly_summary.set_index('month')[
-            'total_transacciones']
+        monthly_revenue = self._monthly_indexed['ingresos_total']
+        monthly_transactions = self._monthly_indexed['total_transacciones']
 
         if len(monthly_revenue) >= 2:
             # Proyección simple basada en tendencia lineal
@@ -211,24 +232,21 @@ class TotalAnalytics:
 
     def _calculate_diversity_metrics(self):
         """Calcula métricas de diversificación del negocio"""
-        category_revenues = self.stats['by_category']['ingresos']
-        total_revenue = category_revenues.sum()
+        category_revenues = self.stats['by_category']['ingresos'].to_numpy(
+            dtype=np.float64)
+        market_shares = category_revenues / category_revenues.sum()
 
         # Índice Herfindahl-Hirschman (concentración)
-        market_shares = category_revenues / total_revenue
-        hhi = (market_shares ** 2).sum()
+        hhi = float(market_shares @ market_shares)
 
         # Entropía de Shannon (diversidad)
-        shannon_entropy = - \
-            (market_shares * np.log2(market_shares + 1e-10)).sum()
-
-        # Interpretación de concentración
-        if hhi > 0.5:
-            concentration_level = "Alta concentración"
-        elif hhi > 0.25:
-            concentration_level = "Concentración moderada"
-        else:
-            concentration_level = "Baja concentración"
+        shannon_entropy = float(
+            -(market_shares * np.log2(market_shares + 1e-10)).sum())
+
+        # Interpretación de concentración: hasta 0.25 baja, hasta 0.5
+        # moderada y por encima alta
+        concentration_level = CONCENTRATION_LABELS[
+            np.searchsorted(CONCENTRATION_THRESHOLDS, hhi)]
 
         self.stats['diversity'] = {
             'hhi_index': hhi,
@@ -265,13 +283,11 @@ class TotalAnalytics:
         # Agregar métricas adicionales
         categories['participacion'] = self.stats['category_participation']
 
-        # Calcular score de rendimiento
-        categories['performance_score'] = (
-            categories['ingresos'] / categories['ingresos'].max() * 0.4 +
-            categories['cantidad'] / categories['cantidad'].max() * 0.3 +
-            categories['ticket_promedio'] /
-            categories['ticket_promedio'].max() * 0.3
-        )
+        # Calcular score de rendimiento: cada métrica se normaliza por su
+        # máximo y se pondera, todo sobre una sola matriz (categorías x métricas)
+        metrics = categories[list(PERFORMANCE_WEIGHTS)].to_numpy(dtype=np.float64)
+        weights = np.array(list(PERFORMANCE_WEIGHTS.values()))
+        categories['performance_score'] = (metrics / metrics.max(axis=0)) @ weights
 
         return categories.sort_values('performance_score', ascending=False)
 
@@ -279,28 +295,29 @@ class TotalAnalytics:
         """Detecta anomalías en los datos"""
         anomalies = []
 
-        # Detectar transacciones atípicas
-        Q1 = self.combined_df['amount'].quantile(0.25)
-        Q3 = self.combined_df['amount'].quantile(0.75)
+        # Detectar transacciones atípicas: ambos cuartiles en una sola
+        # llamada y solo se cuentan las filas fuera de rango, sin copiarlas
+        amounts = self.combined_df['amount'].to_numpy(dtype=np.float64)
+        Q1, Q3 = np.quantile(amounts, [0.25, 0.75])
         IQR = Q3 - Q1
         lower_bound = Q1 - 1.5 * IQR
         upper_bound = Q3 + 1.5 * IQR
 
-        outliers = self.combined_df[
-            (self.combined_df['amount'] < lower_bound) |
-            (self.combined_df['amount'] > upper_bound)
-        ]
+        outlier_count = np.count_nonzero(
+            (amounts < lower_bound) | (amounts > upper_bound))
 
-        if len(outliers) > 0:
+        if outlier_count > 0:
             anomalies.append(
-                f"Se encontraron {len(outliers)} transacciones atípicas")
+                f"Se encontraron {outlier_count} transacciones atípicas")
 
         # Detectar caídas significativas mes a mes
+        growth_rates_by_metric = self.stats['growth_rates']
         for metric in ['ingresos', 'transacciones']:
-            growth_rates = self.stats['growth_rates'][metric]
-            significant_drops = growth_rates[growth_rates < -20]
+            growth_rates = growth_rates_by_metric[metric]
+            drops = np.flatnonzero(growth_rates.to_numpy() < -20)
 
-            if len(significant_drops) > 0:
+            if len(drops) > 0:
+                significant_drops = growth_rates.iloc[drops]
                 anomalies.append(
                     f"Caída significativa en {metric}: {significant_drops.to_dict()}")
 
@@ -0,0 +1,58 @@
+"""
+Módulo para cachear en disco, en Parquet, los datos preparados de pagos totales
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+from src.common.cache import DiskCache
+from .config import DEFAULT_DATA_PATH, CACHE_DIR, CACHE_MAX_ENTRIES
+
+# Módulos cuyo código determina el contenido de la caché
+_SOURCE_FILES = [
+    Path(__file__),
+    Path(__file__).with_name('data_loader.py'),
+    Path(__file__).with_name('config.py')
+]
+
+# DataFrames que se guardan por cada clave, uno por archivo Parquet
+CACHED_FRAMES = ['combined_df', 'monthly_summary', 'monthly_category_summary']
+
+
+class DataCache(DiskCache):
+    """Cachea en Parquet los DataFrames preparados, indexados por el estado de
+    los CSV"""
+
+    def __init__(self, data_path=DEFAULT_DATA_PATH, cache_dir=CACHE_DIR,
+                 max_entries=CACHE_MAX_ENTRIES):
+        super().__init__(data_path, cache_dir, max_entries, _SOURCE_FILES)
+
+    def load(self, key):
+        """Retorna los DataFrames cacheados, o None si falta alguno"""
+        frames = {}
+        for name in CACHED_FRAMES:
+            cache_file = self._get_cache_file(key, name)
+            try:
+                frames[name] = pd.read_parquet(cache_file)
+            except (OSError, ValueError):
+                return None
+
+        self._touch(key)
+        return frames
+
+    def save(self, key, frames):
+        """Guarda los DataFrames y elimina las entradas más antiguas"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for name in CACHED_FRAMES:
+            frames[name].to_parquet(
+                self._get_cache_file(key, name), compression='zstd')
+
+        self._evict()
+
+    def _get_cache_file(self, key, name):
+        """Retorna la ruta del archivo Parquet de un DataFrame para una clave"""
+        return self.cache_dir / f"{key}-{name}.parquet"
+
+    def _get_entry_files(self, key):
+        return [self._get_cache_file(key, name) for name in CACHED_FRAMES]
@@ -2,6 +2,8 @@
 Configuraciones y constantes para el análisis total de pagos
 """
 
+from importlib.util import find_spec
+
 import matplotlib.pyplot as plt
 import seaborn as sns
 
@@ -9,6 +11,14 @@ import seaborn as sns
 DEFAULT_DATA_PATH = "data/total/"
 DEFAULT_OUTPUT_PATH = "reporte_pagos_totales_completo.pdf"
 
+# Motor de lectura CSV: PyArrow (parser multihilo en C++) si está instalado
+CSV_ENGINE = 'pyarrow' if find_spec('pyarrow') is not None else 'c'
+
+# Configuración de caché de datos preparados (Parquet, requiere PyArrow)
+CACHE_ENABLED = find_spec('pyarrow') is not None
+CACHE_DIR = ".cache/total/"
+CACHE_MAX_ENTRIES = 8
+
 # Configuración de meses
 MONTHS = ['mayo', 'junio', 'julio']
 MONTH_NAMES = {
@@ -62,6 +72,7 @@ GRID_CONFIG = {
 MESSAGES = {
     'loading_success': "Cargado: {file_path} - {records} registros",
     'loading_error': "No se encontro: {file_path}",
+    'cache_hit': "Datos preparados recuperados de cache: {cache_key}",
     'pdf_generating': "Generando reporte PDF...",
     'pdf_success': "Reporte generado exitosamente: {output_file}",
     'analysis_start': "Iniciando analisis de pagos totales...",
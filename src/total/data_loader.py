@@ -2,31 +2,57 @@
 Módulo para cargar y preparar datos de pagos totales
 """
 
+import numpy as np
 import pandas as pd
-from .config import DEFAULT_DATA_PATH, MONTHS, MONTH_NAMES, CATEGORY_NAMES, MESSAGES
+from pandas.api.types import is_numeric_dtype
+from .cache import DataCache
+from .config import (
+    DEFAULT_DATA_PATH, CSV_ENGINE, CACHE_ENABLED, MONTHS, MONTH_NAMES,
+    CATEGORY_NAMES, MESSAGES
+)
+
+if CSV_ENGINE == 'pyarrow':
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+# Columnas de baja cardinalidad: se leen como categorías desde el parser.
+# El email (un valor por cliente) se conserva como texto
+CATEGORY_COLUMNS = ['relatedEntityType']
+
+# Columnas de los resúmenes mensuales, en el orden del reporte
+SUMMARY_COLUMNS = [
+    'ingresos_total', 'ticket_promedio', 'total_transacciones', 'clientes_únicos'
+]
 
 
 class TotalDataLoader:
     """Maneja la carga y preparación de datos de todos los tipos de pagos"""
 
-    def __init__(self, data_path=DEFAULT_DATA_PATH):
+    def __init__(self, data_path=DEFAULT_DATA_PATH, use_cache=CACHE_ENABLED):
         self.data_path = data_path
         self.dfs = {}
         self.combined_df = None
         self.monthly_summary = None
         self.monthly_category_summary = None
+        self.data_cache = DataCache(data_path) if use_cache else None
+        self._cache_key = None
+        self._restored = False
 
     def load_data(self):
-        """Carga los datos de los 3 meses"""
+        """Carga los datos de los 3 meses, o los datos ya preparados desde la
+        caché si los CSV no cambiaron"""
+        self._restored = self._restore_from_cache()
+        if self._restored:
+            return
+
         for month in MONTHS:
             file_path = f"{self.data_path}total-{month}.csv"
             try:
-                df = pd.read_csv(file_path)
+                df = self._read_csv(file_path)
                 df['month'] = MONTH_NAMES[month]
                 df['month_order'] = MONTHS.index(month) + 1
-                # Limpiar categorías
-                df['category_clean'] = df['relatedEntityType'].map(
-                    CATEGORY_NAMES).fillna(df['relatedEntityType'])
+                df['category_clean'] = self._clean_categories(
+                    df['relatedEntityType'])
                 self.dfs[month] = df
                 print(MESSAGES['loading_success'].format(
                     file_path=file_path, records=len(df)
@@ -34,53 +60,164 @@ class TotalDataLoader:
             except FileNotFoundError:
                 print(MESSAGES['loading_error'].format(file_path=file_path))
 
+    def _restore_from_cache(self):
+        """Recupera los DataFrames preparados de la caché en disco"""
+        if self.data_cache is None:
+            return False
+
+        self._cache_key = self.data_cache.get_key()
+        cached = self.data_cache.load(self._cache_key)
+        if cached is None:
+            return False
+
+        self.combined_df = cached['combined_df']
+        self.monthly_summary = cached['monthly_summary']
+        self.monthly_category_summary = cached['monthly_category_summary']
+
+        # Vistas por mes de los datos combinados, en orden de meses
+        self.dfs = {
+            MONTHS[month_order - 1]: df
+            for month_order, df in self.combined_df.groupby('month_order')
+        }
+        print(MESSAGES['cache_hit'].format(cache_key=self._cache_key))
+        return True
+
+    @staticmethod
+    def _read_csv(file_path):
+        """Lee un CSV con las columnas categóricas ya codificadas"""
+        if CSV_ENGINE == 'pyarrow':
+            table = pa_csv.read_csv(
+                file_path, convert_options=pa_csv.ConvertOptions(column_types={
+                    column: pa.dictionary(pa.int32(), pa.string())
+                    for column in CATEGORY_COLUMNS
+                }))
+            return table.to_pandas()
+
+        return pd.read_csv(
+            file_path, dtype=dict.fromkeys(CATEGORY_COLUMNS, 'category'))
+
+    @staticmethod
+    def _clean_categories(categories):
+        """Traduce las categorías a sus nombres legibles, mapeando las
+        categorías y no las filas. Las categorías que terminan con el mismo
+        nombre se fusionan en una sola"""
+        labels = categories.cat.categories.map(
+            lambda category: CATEGORY_NAMES.get(category, category))
+        new_categories = labels.unique()
+
+        # El código -1 (sin categoría) toma el -1 agregado al final
+        label_codes = np.append(new_categories.get_indexer(labels), -1)
+        new_codes = label_codes[categories.cat.codes.to_numpy()]
+        return pd.Series(
+            pd.Categorical.from_codes(new_codes, categories=new_categories),
+            index=categories.index)
+
     def prepare_data(self):
         """Prepara y combina los datos"""
+        # Los datos recuperados de la caché ya están preparados
+        if self._restored:
+            return
+
         if not self.dfs:
             raise ValueError(
                 "No se cargaron datos. Ejecuta load_data() primero.")
 
-        # Combinar todos los dataframes
+        # Combinar todos los dataframes; con las mismas categorías en todos
+        # los meses, concat conserva el tipo categórico
+        self._align_categories()
         self.combined_df = pd.concat(self.dfs.values(), ignore_index=True)
 
-        # Limpiar y estandarizar datos
-        self.combined_df['amount'] = pd.to_numeric(
-            self.combined_df['amount'], errors='coerce'
-        )
-        self.combined_df = self.combined_df.dropna(subset=['amount'])
+        # Limpiar y estandarizar datos. El parser ya infiere float64 cuando
+        # todos los montos son válidos
+        if not is_numeric_dtype(self.combined_df['amount']):
+            self.combined_df['amount'] = pd.to_numeric(
+                self.combined_df['amount'], errors='coerce'
+            )
+        valid_amounts = self.combined_df['amount'].notna()
+        if not valid_amounts.all():
+            self.combined_df = self.combined_df[valid_amounts]
+            for column in CATEGORY_COLUMNS + ['category_clean']:
+                self.combined_df[column] = (
+                    self.combined_df[column].cat.remove_unused_categories())
 
         # Crear resúmenes
-        self._create_monthly_summary()
-        self._create_monthly_category_summary()
+        self._create_summaries()
 
-    def _create_monthly_summary(self):
-        """Crea el resumen mensual total"""
-        self.monthly_summary = self.combined_df.groupby(['month', 'month_order']).agg({
-            'amount': ['sum', 'mean', 'count'],
-            'email': 'nunique'
-        }).round(2)
+        if self.data_cache is not None:
+            self.data_cache.save(self._cache_key, {
+                'combined_df': self.combined_df,
+                'monthly_summary': self.monthly_summary,
+                'monthly_category_summary': self.monthly_category_summary
+            })
+
+    def _align_categories(self):
+        """Unifica las categorías de cada mes, ordenadas alfabéticamente"""
+        for column in CATEGORY_COLUMNS + ['category_clean']:
+            categories = sorted(set().union(
+                *(df[column].cat.categories for df in self.dfs.values())))
+            for df in self.dfs.values():
+                df[column] = df[column].cat.set_categories(categories)
+
+    def _create_summaries(self):
+        """Crea los resúmenes mensual y mensual por categoría con un solo
+        groupby sobre los datos combinados"""
+        # Agregados por (mes, categoría); dropna=False conserva las filas
+        # sin categoría para que cuenten en los totales del mes. Solo se
+        # agrupan las combinaciones presentes y sin ordenar: cada resumen se
+        # ordena una vez al final
+        group_keys = ['month', 'month_order', 'category_clean']
+        by_month_category = self.combined_df.groupby(
+            group_keys, dropna=False, observed=True, sort=False
+        ).agg(
+            ingresos_total=('amount', 'sum'),
+            total_transacciones=('amount', 'count')
+        )
+
+        # Clientes únicos: los pares (mes, categoría, email) se deduplican una
+        # sola vez y luego solo se cuentan filas por grupo, sin un nunique
+        # (un conjunto de emails) por grupo
+        customers = self.combined_df[group_keys + ['email']].dropna(
+            subset=['email']).drop_duplicates()
+        by_month_category['clientes_únicos'] = customers.groupby(
+            group_keys, dropna=False, observed=True, sort=False
+        ).size().reindex(by_month_category.index, fill_value=0)
+
+        self._create_monthly_summary(by_month_category, customers)
+        self._create_monthly_category_summary(by_month_category)
+
+    def _create_monthly_summary(self, by_month_category, customers):
+        """Crea el resumen mensual total a partir de los agregados por categoría
+        y de los clientes ya deduplicados por (mes, categoría)"""
+        monthly = by_month_category.groupby(
+            level=['month', 'month_order'], sort=False)[
+            ['ingresos_total', 'total_transacciones']].sum()
+        monthly['ticket_promedio'] = (
+            monthly['ingresos_total'] / monthly['total_transacciones'])
+
+        # Un cliente puede pagar en varias categorías: los clientes únicos
+        # del mes no se pueden sumar desde las categorías, se deduplican de
+        # nuevo sobre la tabla ya reducida
+        month_keys = ['month', 'month_order']
+        month_customers = customers[month_keys + ['email']].drop_duplicates()
+        monthly['clientes_únicos'] = month_customers.groupby(
+            month_keys, sort=False).size().reindex(monthly.index, fill_value=0)
 
-        self.monthly_summary.columns = [
-            'ingresos_total', 'ticket_promedio', 'total_transacciones', 'clientes_únicos'
-        ]
         self.monthly_summary = (
-            self.monthly_summary.reset_index().sort_values('month_order')
+            monthly[SUMMARY_COLUMNS].reset_index()
+            .sort_values('month_order')
         )
 
-    def _create_monthly_category_summary(self):
+    def _create_monthly_category_summary(self, by_month_category):
         """Crea el resumen mensual por categoría"""
-        self.monthly_category_summary = self.combined_df.groupby([
-            'month', 'month_order', 'category_clean'
-        ]).agg({
-            'amount': ['sum', 'mean', 'count'],
-            'email': 'nunique'
-        }).round(2)
+        summary = by_month_category[
+            by_month_category.index.get_level_values('category_clean').notna()
+        ].copy()
+        summary['ticket_promedio'] = (
+            summary['ingresos_total'] / summary['total_transacciones'])
 
-        self.monthly_category_summary.columns = [
-            'ingresos_total', 'ticket_promedio', 'total_transacciones', 'clientes_únicos'
-        ]
         self.monthly_category_summary = (
-            self.monthly_category_summary.reset_index()
+            summary[SUMMARY_COLUMNS].reset_index()
+            .sort_values(['month_order', 'category_clean'], ignore_index=True)
         )
 
     def get_data(self):
@@ -135,17 +272,19 @@ class TotalDataLoader:
         if self.combined_df is None:
             return None
 
-        return self.combined_df.groupby('category_clean').agg({
+        return self.combined_df.groupby('category_clean', observed=True, sort=False).agg({
             'amount': ['sum', 'count', 'mean'],
             'email': 'nunique'
-        }).round(2)
+        })
 
     def get_monthly_evolution_by_category(self):
         """Retorna evolución mensual por categoría"""
         if self.combined_df is None:
             return None
 
-        return self.combined_df.groupby(['month', 'category_clean'])['amount'].sum().unstack(fill_value=0)
+        return self.combined_df.groupby(
+            ['month', 'category_clean'], observed=True, sort=False
+        )['amount'].sum().unstack(fill_value=0)
 
     def get_data_quality_report(self):
         """Genera un reporte de calidad de datos"""
@@ -147,7 +147,7 @@ class TotalReportGenerator:
                 fontsize=FONT_SIZES['section'], fontweight='bold', transform=ax.transAxes)
 
         # Tabla 2: Resumen por categorías
-        table_data_category = self.stats['by_category'].copy()
+        table_data_category = self.stats['by_category'].round(2)
         table_data_category['ingresos'] = table_data_category['ingresos'].apply(
             lambda x: f'S/ {x:,.0f}')
         table_data_category['ticket_promedio'] = table_data_category['ticket_promedio'].apply(
@@ -240,17 +240,18 @@ INSIGHTS CLAVE DEL ANALISIS:
             self.combined_df.to_excel(
                 writer, sheet_name='Datos_Completos', index=False)
 
-            # Resumen mensual
-            self.monthly_summary.to_excel(
+            # Resumen mensual; los resúmenes se redondean a centavos solo
+            # al exportarlos
+            self.monthly_summary.round(2).to_excel(
                 writer, sheet_name='Resumen_Mensual', index=False)
 
             # Resumen mensual por categoría
-            self.monthly_category_summary.to_excel(
+            self.monthly_category_summary.round(2).to_excel(
                 writer, sheet_name='Resumen_Mensual_Categoria', index=False
             )
 
             # Estadísticas por categoría
-            self.stats['by_category'].to_excel(
+            self.stats['by_category'].round(2).to_excel(
                 writer, sheet_name='Estadisticas_Categorias')
 
             # Tasas de crecimiento
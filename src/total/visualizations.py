@@ -91,7 +91,7 @@ MEJOR MES: {self.stats['trends']['mejor_mes_ingresos']}
 CATEGORIA MAS EXITOSA: {self.stats['trends']['mejor_categoria']}
 
 DISTRIBUCION POR CATEGORIA:
-{self.stats['by_category'].to_string()}
+{self.stats['by_category'].round(2).to_string()}
 
 PROYECCIONES AGOSTO:
 • Ingresos estimados: S/ {self.stats['projections']['agosto_ingresos_estimados']:,.0f}